@@ -1,180 +1,175 @@
+import asyncio
+import os
 import sqlite3
-import flet as ft
-
-# Banco de Dados
-class Database:
-    def __init__(self, db_name="gestao.db"):
-        self.conn = sqlite3.connect(db_name)
-        self.create_tables()
-
-    def create_tables(self):
-        with self.conn:
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                email TEXT NOT NULL UNIQUE,
-                senha TEXT NOT NULL,
-                tipo TEXT NOT NULL CHECK(tipo IN ('Administrador', 'Demandante', 'Bolsista'))
-            )
-            ''')
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS demandas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                titulo TEXT NOT NULL,
-                descricao TEXT,
-                solicitante_id INTEGER,
-                projeto_id INTEGER,
-                status TEXT DEFAULT 'Pendente',
-                bolsista_id INTEGER,
-                FOREIGN KEY (solicitante_id) REFERENCES usuarios (id),
-                FOREIGN KEY (projeto_id) REFERENCES projetos (id),
-                FOREIGN KEY (bolsista_id) REFERENCES usuarios (id)
-            )
-            ''')
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS projetos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                area TEXT NOT NULL
-            )
-            ''')
-            self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS projeto_usuarios (
-                projeto_id INTEGER,
-                usuario_id INTEGER,
-                PRIMARY KEY (projeto_id, usuario_id),
-                FOREIGN KEY (projeto_id) REFERENCES projetos (id),
-                FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
-            )
-            ''')
-
-    def adicionar_usuario(self, nome, email, senha, tipo):
-        with self.conn:
-            self.conn.execute(
-                "INSERT INTO usuarios (nome, email, senha, tipo) VALUES (?, ?, ?, ?)", (nome, email, senha, tipo)
-            )
-
-    def validar_usuario(self, email, senha):
-        with self.conn:
-            return self.conn.execute(
-                "SELECT id, nome, tipo FROM usuarios WHERE email = ? AND senha = ?",
-                (email, senha)
-            ).fetchone()
-
-    def listar_demandas(self, usuario_id=None, tipo_usuario=None):
-        with self.conn:
-            if tipo_usuario == "Demandante":
-                return self.conn.execute(
-                    "SELECT * FROM demandas WHERE solicitante_id = ?", (usuario_id,)
-                ).fetchall()
-            elif tipo_usuario == "Bolsista":
-                return self.conn.execute(
-                    "SELECT * FROM demandas WHERE bolsista_id = ?", (usuario_id,)
-                ).fetchall()
-            elif tipo_usuario == "Administrador":
-                return self.conn.execute(
-                    "SELECT * FROM demandas"
-                ).fetchall()
-            else:
-                return []
-
-    def listar_usuarios(self, tipo):
-        with self.conn:
-            return self.conn.execute(
-                "SELECT id, nome, email FROM usuarios WHERE tipo = ?", (tipo,)
-            ).fetchall()
-
-    def remover_usuario(self, usuario_id):
-        with self.conn:
-            self.conn.execute("DELETE FROM usuarios WHERE id = ?", (usuario_id,))
-
-    def listar_projetos(self, usuario_id=None, tipo_usuario=None):
-        with self.conn:
-            if tipo_usuario == "Administrador":
-                return self.conn.execute(
-                    "SELECT id, nome, area FROM projetos WHERE id IN (SELECT projeto_id FROM projeto_usuarios WHERE usuario_id = ?)",
-                    (usuario_id,)
-                ).fetchall()
-            else:
-                return self.conn.execute("SELECT id, nome, area FROM projetos").fetchall()
-
-    def adicionar_projeto(self, nome, area):
-        with self.conn:
-            self.conn.execute(
-                "INSERT INTO projetos (nome, area) VALUES (?, ?)", (nome, area)
-            )
-            return self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
 
-    def adicionar_participante_projeto(self, projeto_id, usuario_id):
-        with self.conn:
-            self.conn.execute(
-                "INSERT INTO projeto_usuarios (projeto_id, usuario_id) VALUES (?, ?, ?)", (projeto_id, usuario_id)
-            )
-
-    def remover_participante_projeto(self, projeto_id, usuario_id):
-        with self.conn:
-            self.conn.execute(
-                "DELETE FROM projeto_usuarios WHERE projeto_id = ? AND usuario_id = ?", (projeto_id, usuario_id)
-            )
-
-    def cadastrar_demanda(self, titulo, descricao, solicitante_id, projeto_id):
-        with self.conn:
-            self.conn.execute(
-                "INSERT INTO demandas (titulo, descricao, solicitante_id, projeto_id) VALUES (?, ?, ?, ?)",
-                (titulo, descricao, solicitante_id, projeto_id)
-            )
-
-    def atualizar_status_demanda(self, demanda_id, status, bolsista_id=None):
-        with self.conn:
-            self.conn.execute(
-                "UPDATE demandas SET status = ?, bolsista_id = ? WHERE id = ?",
-                (status, bolsista_id, demanda_id)
-            )
+import flet as ft
 
-    def atribuir_demanda(self, bolsista_id, demanda_id):
-        with self.conn:
-            self.conn.execute(
-                "UPDATE demandas SET bolsista_id = ? WHERE id = ?", (bolsista_id, demanda_id)
-            )
+from banco_dados import AsyncDatabase, Database, instrumentacao
 
-    def obter_demanda(self, demanda_id):
-        with self.conn:
-            return self.conn.execute("SELECT * FROM demandas WHERE id = ?", (demanda_id,)).fetchone()
+# Interface Flet
 
-    def atualizar_estado_demanda(self, demanda_id, novo_estado):
-        with self.conn:
-            self.conn.execute("UPDATE demandas SET estado = ? WHERE id = ?", (novo_estado, demanda_id))
+# Lista de controles indexada pelo id de cada linha (linha[0]): a cada atualização
+# só cria, remove ou substitui os controles das linhas que mudaram
+class ListaChaveada:
+    def __init__(self, container, renderizar, atributo="controls"):
+        self.container = container
+        self.renderizar = renderizar
+        self.atributo = atributo
+        self._itens = {}
+
+    @property
+    def controles(self):
+        return getattr(self.container, self.atributo)
+
+    def _item(self, linha):
+        item = self._itens.get(linha[0])
+        if item is None or item[0] != linha:
+            item = (linha, self.renderizar(linha))
+        return item
+
+    def sincronizar(self, linhas):
+        itens = {}
+        for linha in linhas:
+            itens[linha[0]] = self._item(linha)
+        self._itens = itens
+        self.controles[:] = [controle for _, controle in itens.values()]
+
+    def ids(self):
+        return list(self._itens)
+
+    def anexar(self, linhas):
+        for linha in linhas:
+            if not self.atualizar(linha):
+                self._itens[linha[0]] = item = self._item(linha)
+                self.controles.append(item[1])
+
+    def atualizar(self, linha):
+        atual = self._itens.get(linha[0])
+        if atual is None:
+            return False
+        novo = self._item(linha)
+        if novo is not atual:
+            controles = self.controles
+            controles[controles.index(atual[1])] = novo[1]
+            self._itens[linha[0]] = novo
+        return True
+
+    def remover(self, chave):
+        item = self._itens.pop(chave, None)
+        if item is not None:
+            self.controles.remove(item[1])
+
+
+# Campo com sugestões buscadas no servidor: espera uma pausa na digitação, cancela a busca anterior
+# e mostra no máximo `limite` opções. `valor` guarda o id da opção escolhida
+class CampoBusca:
+    ESPERA = 0.3
+
+    def __init__(self, page, label, buscar, limite=8, ao_selecionar=None):
+        self.page = page
+        self.buscar = buscar
+        self.limite = limite
+        self.ao_selecionar = ao_selecionar
+        self.valor = None
+        self._tarefa = None
+        self.campo = ft.TextField(label=label, on_change=self._ao_digitar)
+        self.opcoes = ft.Column()
+        self.controle = ft.Column([self.campo, self.opcoes])
+
+    async def _ao_digitar(self, e):
+        self.valor = None
+        if self._tarefa:
+            self._tarefa.cancel()
+        self._tarefa = asyncio.create_task(self._sugerir(self.campo.value or ""))
+
+    async def _sugerir(self, texto):
+        await asyncio.sleep(self.ESPERA)
+        sugestoes = await self.buscar(texto, self.limite)
+        self.opcoes.controls[:] = [
+            ft.TextButton(sugestao.texto, on_click=self._ao_escolher(sugestao)) for sugestao in sugestoes
+        ]
+        self.page.update()
+
+    def _ao_escolher(self, sugestao):
+        async def escolher(e):
+            self.definir(sugestao.id, sugestao.texto)
+            if self.ao_selecionar:
+                await self.ao_selecionar(sugestao.id)
+            self.page.update()
+        return escolher
+
+    def definir(self, valor, texto):
+        if self._tarefa:
+            self._tarefa.cancel()
+        self.valor = valor
+        self.campo.value = texto
+        self.opcoes.controls.clear()
 
-# Interface Flet
 def main(page: ft.Page):
-    db = Database()
+    db = AsyncDatabase(Database(publicar=lambda alteracao_id: page.pubsub.send_all_on_topic("demandas", alteracao_id)))
     page.title = "Gestão de Demandas e Projetos"
     page.scroll = "auto"
 
+    # Tela atual que acompanha alterações de demandas publicadas por outras sessões
+    visao = {"aplicar_alteracoes": None}
+
+    async def receber_alteracao(topico, alteracao_id):
+        aplicar_alteracoes = visao["aplicar_alteracoes"]
+        if aplicar_alteracoes:
+            await aplicar_alteracoes(alteracao_id)
+
+    page.pubsub.subscribe_topic("demandas", receber_alteracao)
+
     def limpar_tela():
+        visao["aplicar_alteracoes"] = None
         page.controls.clear()
         page.update()
 
+    # Busca só as alterações das demandas do usuário e das que a tela mostra; se o intervalo já saiu
+    # da retenção de alteracoes, recarrega a lista inteira
+    def acompanhar_demandas(lista_demandas, busca_field, tipo_usuario, ultima_alteracao, recarregar):
+        estado = {"ultima_alteracao": ultima_alteracao}
+        campo = "solicitante_id" if tipo_usuario == "Demandante" else "bolsista_id"
+
+        async def aplicar_alteracoes(alteracao_id):
+            if alteracao_id <= estado["ultima_alteracao"]:
+                return
+            usuario_id = page.session.get("user_id")
+            ultima, demandas = await db.listar_demandas_alteradas(
+                estado["ultima_alteracao"], usuario_id, tipo_usuario, lista_demandas.ids()
+            )
+            estado["ultima_alteracao"] = max(estado["ultima_alteracao"], ultima)
+            if demandas is None:
+                await recarregar()
+                return
+            for demanda in demandas:
+                if getattr(demanda, campo) != usuario_id:
+                    lista_demandas.remover(demanda.id)
+                elif not lista_demandas.atualizar(demanda) and not busca_field.value:
+                    lista_demandas.anexar([demanda])
+            page.update()
+
+        visao["aplicar_alteracoes"] = aplicar_alteracoes
+
     def login_page(e=None):
         limpar_tela()
 
-        def autenticar_usuario(e):
+        async def autenticar_usuario(e):
             email = email_field.value
             senha = senha_field.value
-            usuario = db.validar_usuario(email, senha)
+            usuario = await db.validar_usuario(email, senha)
 
             if usuario:
-                page.session.set("user_id", usuario[0])
-                page.session.set("user_name", usuario[1])
-                page.session.set("user_type", usuario[2])
+                page.session.set("user_id", usuario.id)
+                page.session.set("user_name", usuario.nome)
+                page.session.set("user_type", usuario.tipo)
 
-                if usuario[2] == "Administrador":
+                if usuario.tipo == "Administrador":
                     administrador_menu()
-                elif usuario[2] == "Demandante":
-                    demandante_page()
-                elif usuario[2] == "Bolsista":
-                    bolsista_page()
+                elif usuario.tipo == "Demandante":
+                    await demandante_page()
+                elif usuario.tipo == "Bolsista":
+                    await bolsista_page()
             else:
                 page.snack_bar = ft.SnackBar(ft.Text("Credenciais inválidas!"))
                 page.snack_bar.open = True
@@ -201,10 +196,10 @@ def main(page: ft.Page):
     def cadastro_page():
         limpar_tela()
 
-        def cadastrar_usuario(e):
+        async def cadastrar_usuario(e):
             if nome_field.value and email_field.value and senha_field.value and tipo_selector.value:
                 try:
-                    db.adicionar_usuario(
+                    await db.adicionar_usuario(
                         nome_field.value,
                         email_field.value,
                         senha_field.value,
@@ -255,26 +250,22 @@ def main(page: ft.Page):
         def voltar_ao_login(e):
             login_page()
 
-        def gerenciar_projetos_page(e):
+        async def gerenciar_projetos_page(e):
             limpar_tela()
 
-            def adicionar_projeto(e):
+            async def adicionar_projeto(e):
                 if nome_projeto_field.value and area_projeto_field.value:
-                    projeto_id = db.adicionar_projeto(nome_projeto_field.value, area_projeto_field.value)
+                    projeto_id = await db.adicionar_projeto(nome_projeto_field.value, area_projeto_field.value)
                     page.snack_bar = ft.SnackBar(ft.Text(f"Projeto '{nome_projeto_field.value}' adicionado com sucesso!"))
                     page.snack_bar.open = True
                     nome_projeto_field.value = ""
                     area_projeto_field.value = ""
-                    listar_projetos()
+                    await listar_projetos()
                     page.update()
 
-            def listar_projetos():
-                projetos = db.listar_projetos()
-                projetos_list.controls.clear()
-                for projeto in projetos:
-                    projetos_list.controls.append(
-                        ft.Text(f"{projeto[1]} - {projeto[2]}")
-                    )
+            async def listar_projetos():
+                projetos = await db.listar_projetos()
+                lista_projetos.sincronizar(projetos)
                 page.update()
 
             voltar_button = ft.ElevatedButton("Voltar", on_click=administrador_menu)
@@ -284,6 +275,7 @@ def main(page: ft.Page):
             adicionar_projeto_button = ft.ElevatedButton("Adicionar Projeto", on_click=adicionar_projeto)
 
             projetos_list = ft.Column()
+            lista_projetos = ListaChaveada(projetos_list, lambda projeto: ft.Text(f"{projeto.nome} - {projeto.area}"))
 
             page.add(
                 ft.Column([
@@ -297,48 +289,84 @@ def main(page: ft.Page):
                 ])
             )
 
-            listar_projetos()
+            await listar_projetos()
 
-        def gerenciar_demandas_page(e):
+        async def gerenciar_demandas_page(e):
             limpar_tela()
 
-            def listar_demandas():
-                demandas = db.listar_demandas(tipo_usuario="Administrador")
-                demandas_list.controls.clear()
-                demanda_selector.options.clear()
-                for demanda in demandas:
-                    demandas_list.controls.append(
-                        ft.Row([
-                            ft.Text(f"{demanda[1]} - {demanda[5]} - Status: {demanda[4]}"),
-                            ft.ElevatedButton("Selecionar", on_click=lambda e, demanda_id=demanda[0]: selecionar_demanda(demanda_id))
-                        ])
-                    )
-                    demanda_selector.options.append(ft.dropdown.Option(demanda[0], text=f"{demanda[1]} - {demanda[5]}"))
+            TAMANHO_PAGINA = 50
+            paginacao = {"ultimo_id": 0, "fim": False, "carregando": False}
+
+            async def carregar_pagina():
+                if paginacao["fim"] or paginacao["carregando"]:
+                    return
+                paginacao["carregando"] = True
+                demandas = await db.listar_demandas_pagina(
+                    apos_id=paginacao["ultimo_id"],
+                    limite=TAMANHO_PAGINA,
+                    status=filtro_status.value if filtro_status.value != "Todas" else None
+                )
+                if paginacao["ultimo_id"] == 0:
+                    lista_demandas.sincronizar(demandas)
+                else:
+                    lista_demandas.anexar(demandas)
+                if demandas:
+                    paginacao["ultimo_id"] = demandas[-1].id
+                paginacao["fim"] = len(demandas) < TAMANHO_PAGINA
+                paginacao["carregando"] = False
                 page.update()
 
-            def selecionar_demanda(demanda_id):
-                page.session.set("selected_demanda_id", demanda_id)
-                demanda = db.obter_demanda(demanda_id)
-                demanda_selector.value = demanda_id
-                status_selector.value = demanda[4]
+            def renderizar_demanda(demanda):
+                return ft.Row([
+                    ft.Text(f"{demanda.titulo} - Status: {demanda.status}"),
+                    ft.ElevatedButton("Selecionar", on_click=ao_selecionar_demanda(demanda.id))
+                ])
+
+            async def listar_demandas(e=None):
+                paginacao.update(ultimo_id=0, fim=False, carregando=False)
+                if busca_field.value:
+                    # Resultados da busca vêm por relevância (ou das mais recentes, se a busca for ampla), sem paginação
+                    paginacao["fim"] = True
+                    demandas = await db.buscar_demandas(busca_field.value, tipo_usuario="Administrador")
+                    lista_demandas.sincronizar(demandas)
+                    page.update()
+                else:
+                    await carregar_pagina()
+
+            async def rolar_demandas(e):
+                if e.pixels >= e.max_scroll_extent - 100:
+                    await carregar_pagina()
+
+            def ao_selecionar_demanda(demanda_id):
+                async def selecionar(e):
+                    await selecionar_demanda(demanda_id)
+                return selecionar
+
+            async def selecionar_demanda(demanda_id):
+                demanda = await db.obter_demanda_resumo(demanda_id)
+                demanda_campo.definir(demanda_id, f"{demanda.titulo} - {demanda.status}")
+                status_selector.value = demanda.status
                 page.update()
 
-            def atualizar_status(e):
-                demanda_id = page.session.get("selected_demanda_id")
+            # Usa a demanda que o campo mostra; se o texto foi redigitado sem escolher uma opção, valor é None
+            async def atualizar_status(e):
+                demanda_id = demanda_campo.valor
                 novo_status = status_selector.value
-                if demanda_id and novo_status:
-                    db.atualizar_status_demanda(demanda_id, novo_status)
+                if demanda_id is not None and novo_status:
+                    await db.atualizar_status_demanda(demanda_id, novo_status)
                     page.snack_bar = ft.SnackBar(ft.Text("Status da demanda atualizado com sucesso!"))
                     page.snack_bar.open = True
-                    listar_demandas()
+                    demanda = await db.obter_demanda_resumo(demanda_id)
+                    demanda_campo.definir(demanda_id, f"{demanda.titulo} - {demanda.status}")
+                    if filtro_status.value in ("Todas", demanda.status):
+                        lista_demandas.atualizar(demanda)
+                    else:
+                        lista_demandas.remover(demanda_id)
                     page.update()
 
             voltar_button = ft.ElevatedButton("Voltar", on_click=administrador_menu)
 
-            demanda_selector = ft.Dropdown(
-                label="Selecione a Demanda",
-                options=[]
-            )
+            demanda_campo = CampoBusca(page, "Selecione a Demanda", db.sugerir_demandas, ao_selecionar=selecionar_demanda)
             status_selector = ft.Dropdown(
                 label="Novo Status",
                 options=[
@@ -351,79 +379,196 @@ def main(page: ft.Page):
             )
             atualizar_button = ft.ElevatedButton("Atualizar Status", on_click=atualizar_status)
 
-            demandas_list = ft.Column()
+            filtro_status = ft.Dropdown(
+                label="Filtrar por Status",
+                value="Todas",
+                options=[
+                    ft.dropdown.Option("Todas"),
+                    ft.dropdown.Option("Recusada"),
+                    ft.dropdown.Option("Pendente"),
+                    ft.dropdown.Option("Em Andamento"),
+                    ft.dropdown.Option("Concluída"),
+                    ft.dropdown.Option("Entregue")
+                ],
+                on_change=listar_demandas
+            )
+
+            busca_field = ft.TextField(label="Buscar Demandas", on_submit=listar_demandas)
+
+            demandas_list = ft.ListView(height=400, on_scroll=rolar_demandas, on_scroll_interval=100)
+            lista_demandas = ListaChaveada(demandas_list, renderizar_demanda)
 
             page.add(
                 ft.Column([
                     ft.Text("Gerenciar Demandas", size=24, weight="bold"),
+                    busca_field,
+                    filtro_status,
                     demandas_list,
-                    demanda_selector,
+                    demanda_campo.controle,
                     status_selector,
                     atualizar_button,
                     voltar_button
                 ])
             )
 
-            listar_demandas()
+            await listar_demandas()
 
-        def gerenciar_bolsistas_page(e):
+        async def gerenciar_bolsistas_page(e):
             limpar_tela()
 
-            def listar_bolsistas():
-                bolsistas = db.listar_usuarios(tipo="Bolsista")
-                bolsistas_list.controls.clear()
-                bolsista_selector.options.clear()
-                for bolsista in bolsistas:
-                    bolsistas_list.controls.append(
-                        ft.Text(f"{bolsista[1]} - {bolsista[2]}")
-                    )
-                    bolsista_selector.options.append(ft.dropdown.Option(bolsista[0], text=bolsista[1]))
-                page.update()
-
-            def listar_demandas():
-                demandas = db.listar_demandas(tipo_usuario="Administrador")
-                demanda_selector.options.clear()
-                for demanda in demandas:
-                    demanda_selector.options.append(ft.dropdown.Option(demanda[0], text=f"{demanda[1]} - {demanda[5]}"))
+            async def listar_bolsistas():
+                bolsistas = await db.listar_usuarios(tipo="Bolsista")
+                lista_bolsistas.sincronizar(bolsistas)
                 page.update()
 
-            def atribuir_demanda(e):
-                if bolsista_selector.value and demanda_selector.value:
-                    db.atribuir_demanda(bolsista_selector.value, demanda_selector.value)
+            async def atribuir_demanda(e):
+                if bolsista_campo.valor and demanda_campo.valor:
+                    await db.atribuir_demanda(bolsista_campo.valor, demanda_campo.valor)
                     page.snack_bar = ft.SnackBar(ft.Text("Demanda atribuída com sucesso!"))
                     page.snack_bar.open = True
                     page.update()
 
+            async def distribuir_demandas(e):
+                resultado = await db.distribuir_demandas(somente_participantes=somente_participantes_check.value)
+                texto = f"{resultado['atribuidas']} demandas distribuídas"
+                if resultado["sem_candidato"]:
+                    texto += f", {resultado['sem_candidato']} sem bolsista no projeto"
+                page.snack_bar = ft.SnackBar(ft.Text(texto))
+                page.snack_bar.open = True
+                page.update()
+
             voltar_button = ft.ElevatedButton("Voltar", on_click=administrador_menu)
 
-            bolsista_selector = ft.Dropdown(label="Selecione o Bolsista")
-            demanda_selector = ft.Dropdown(label="Selecione a Demanda")
+            bolsista_campo = CampoBusca(page, "Selecione o Bolsista", db.sugerir_bolsistas)
+            demanda_campo = CampoBusca(page, "Selecione a Demanda", db.sugerir_demandas)
             atribuir_button = ft.ElevatedButton("Atribuir Demanda", on_click=atribuir_demanda)
+            somente_participantes_check = ft.Checkbox(label="Somente bolsistas do projeto da demanda")
+            distribuir_button = ft.ElevatedButton("Distribuir Pendentes", on_click=distribuir_demandas)
 
             bolsistas_list = ft.Column()
+            lista_bolsistas = ListaChaveada(bolsistas_list, lambda bolsista: ft.Text(f"{bolsista.nome} - {bolsista.email}"))
 
             page.add(
                 ft.Column([
                     ft.Text("Gerenciar Bolsistas", size=24, weight="bold"),
-                    bolsista_selector,
-                    demanda_selector,
+                    bolsista_campo.controle,
+                    demanda_campo.controle,
                     atribuir_button,
+                    somente_participantes_check,
+                    distribuir_button,
                     ft.Text("Bolsistas Cadastrados:"),
                     bolsistas_list,
                     voltar_button
                 ])
             )
 
-            listar_bolsistas()
-            listar_demandas()
+            await listar_bolsistas()
+
+        async def painel_page(e):
+            limpar_tela()
+
+            resumo = await db.resumo_demandas()
+
+            por_status = ft.Column([ft.Text(f"{status}: {total}") for status, total in resumo["por_status"]])
+            por_projeto = ft.Column([
+                ft.Text(f"{nome or 'Sem projeto'} - {status}: {total}")
+                for _, nome, status, total in resumo["por_projeto"]
+            ])
+            por_bolsista = ft.Column([
+                ft.Text(f"{nome or f'Bolsista {bolsista_id}'} - {status}: {total}")
+                for bolsista_id, nome, status, total in resumo["por_bolsista"]
+            ])
+            tempo_entrega = ft.Column([
+                ft.Text(f"P{round(percentil * 100)}: {horas:.1f} h")
+                for percentil, horas in await db.percentis_tempo_entrega()
+            ])
+            entregas_por_mes = ft.Column([
+                ft.Text(f"{vazao.periodo}: {vazao.total}") for vazao in await db.vazao_por_periodo("mes")
+            ])
+
+            voltar_button = ft.ElevatedButton("Voltar", on_click=administrador_menu)
+
+            page.add(
+                ft.Column([
+                    ft.Text("Painel de Demandas", size=24, weight="bold"),
+                    ft.Text("Por Status:", size=20, weight="bold"),
+                    por_status,
+                    ft.Text("Por Projeto:", size=20, weight="bold"),
+                    por_projeto,
+                    ft.Text("Por Bolsista:", size=20, weight="bold"),
+                    por_bolsista,
+                    ft.Text("Tempo até a entrega:", size=20, weight="bold"),
+                    tempo_entrega,
+                    ft.Text("Entregas por mês:", size=20, weight="bold"),
+                    entregas_por_mes,
+                    voltar_button
+                ])
+            )
+
+        async def estatisticas_page(e):
+            limpar_tela()
+
+            async def listar_estatisticas(e=None):
+                cache = await db.estatisticas_cache()
+                esperas = await db.estatisticas_esperas()
+                estatisticas = instrumentacao.estatisticas()
+                estatisticas_list.controls.clear()
+                estatisticas_list.controls.append(
+                    ft.Text(f"Cache: {cache['acertos']} acertos, {cache['falhas']} falhas, {cache['itens']} itens")
+                )
+                for tipo, espera in esperas.items():
+                    estatisticas_list.controls.append(
+                        ft.Text(
+                            f"Espera por {tipo}: {espera['ocorrencias']} vezes, total {espera['espera_total_ms']:.2f} ms, "
+                            f"máximo {espera['espera_maxima_ms']:.2f} ms"
+                        )
+                    )
+                if not estatisticas["ativa"]:
+                    estatisticas_list.controls.append(
+                        ft.Text("Instrumentação desativada (defina GESTAO_INSTRUMENTACAO=1 ao iniciar).")
+                    )
+                for nome, metrica in sorted(estatisticas["metodos"].items(), key=lambda item: -item[1]["tempo_total_ms"]):
+                    estatisticas_list.controls.append(
+                        ft.Text(
+                            f"{nome}: {metrica['chamadas']} chamadas, média {metrica['tempo_medio_ms']:.2f} ms, "
+                            f"máximo {metrica['tempo_maximo_ms']:.2f} ms, {metrica['linhas']} linhas"
+                        )
+                    )
+                if estatisticas["consultas_lentas"]:
+                    estatisticas_list.controls.append(ft.Text("Consultas lentas:", weight="bold"))
+                for lenta in reversed(estatisticas["consultas_lentas"]):
+                    estatisticas_list.controls.append(ft.Text(f"{lenta['metodo']} - {lenta['duracao_ms']} ms"))
+                    for comando in lenta["comandos"]:
+                        estatisticas_list.controls.append(
+                            ft.Text(f"{comando['sql']}\n  " + "\n  ".join(comando["plano"]), size=12)
+                        )
+                page.update()
+
+            voltar_button = ft.ElevatedButton("Voltar", on_click=administrador_menu)
+            atualizar_button = ft.ElevatedButton("Atualizar", on_click=listar_estatisticas)
+
+            estatisticas_list = ft.Column()
+
+            page.add(
+                ft.Column([
+                    ft.Text("Estatísticas", size=24, weight="bold"),
+                    estatisticas_list,
+                    atualizar_button,
+                    voltar_button
+                ])
+            )
+
+            await listar_estatisticas()
 
         titulo = ft.Text(f"Bem-vindo(a), Administrador(a): {page.session.get('user_name')}", size=24, weight="bold")
         subtitulo = ft.Text("Selecione uma funcionalidade:", size=16)
 
         opcoes = ft.Column([
+            ft.ElevatedButton("Painel", on_click=painel_page),
             ft.ElevatedButton("Gerenciar Projetos", on_click=gerenciar_projetos_page),
             ft.ElevatedButton("Gerenciar Demandas", on_click=gerenciar_demandas_page),
             ft.ElevatedButton("Gerenciar Bolsistas", on_click=gerenciar_bolsistas_page),
+            ft.ElevatedButton("Estatísticas", on_click=estatisticas_page),
             ft.ElevatedButton("Sair", on_click=voltar_ao_login)
         ])
 
@@ -435,23 +580,23 @@ def main(page: ft.Page):
             ])
         )
 
-    def demandante_page():
+    async def demandante_page():
         limpar_tela()
 
-        def cadastrar_demanda(e):
-            if titulo_field.value and descricao_field.value and projeto_selector.value:
+        async def cadastrar_demanda(e):
+            if titulo_field.value and descricao_field.value and projeto_campo.valor:
                 try:
-                    db.cadastrar_demanda(
+                    await db.cadastrar_demanda(
                         titulo_field.value,
                         descricao_field.value,
                         page.session.get("user_id"),
-                        projeto_selector.value
+                        projeto_campo.valor
                     )
                     page.snack_bar = ft.SnackBar(ft.Text("Demanda cadastrada com sucesso!"))
                     page.snack_bar.open = True
                     titulo_field.value = ""
                     descricao_field.value = ""
-                    listar_demandas()
+                    await listar_demandas()
                     page.update()
                 except Exception as ex:
                     page.snack_bar = ft.SnackBar(ft.Text(f"Erro ao cadastrar demanda: {str(ex)}"))
@@ -462,16 +607,20 @@ def main(page: ft.Page):
                 page.snack_bar.open = True
                 page.update()
 
-        def listar_demandas():
-            demandas = db.listar_demandas(
-                usuario_id=page.session.get("user_id"),
-                tipo_usuario="Demandante"
-            )
-            demandas_list.controls.clear()
-            for demanda in demandas:
-                demandas_list.controls.append(
-                    ft.Text(f"{demanda[1]} - {demanda[5]}")
+        async def listar_demandas(e=None):
+            if busca_field.value:
+                demandas = await db.buscar_demandas(
+                    busca_field.value,
+                    usuario_id=page.session.get("user_id"),
+                    tipo_usuario="Demandante"
+                )
+            else:
+                demandas = await db.listar_demandas(
+                    usuario_id=page.session.get("user_id"),
+                    tipo_usuario="Demandante",
+                    incluir_arquivadas=arquivadas_check.value
                 )
+            lista_demandas.sincronizar(demandas)
             page.update()
 
         voltar_button = ft.ElevatedButton("Sair", on_click=login_page)
@@ -479,15 +628,14 @@ def main(page: ft.Page):
         titulo_field = ft.TextField(label="Título da Demanda")
         descricao_field = ft.TextField(label="Descrição da Demanda", multiline=True)
 
-        projetos = db.listar_projetos()
-        projeto_selector = ft.Dropdown(
-            label="Selecione o Projeto",
-            options=[ft.dropdown.Option(projeto[0], text=projeto[1]) for projeto in projetos]
-        )
+        projeto_campo = CampoBusca(page, "Selecione o Projeto", db.sugerir_projetos)
 
         cadastrar_button = ft.ElevatedButton("Cadastrar Demanda", on_click=cadastrar_demanda)
 
+        busca_field = ft.TextField(label="Buscar Demandas", on_submit=listar_demandas)
+        arquivadas_check = ft.Checkbox(label="Incluir arquivadas", on_change=listar_demandas)
         demandas_list = ft.Column()
+        lista_demandas = ListaChaveada(demandas_list, lambda demanda: ft.Text(f"{demanda.titulo} - {demanda.status}"))
 
         page.add(
             ft.Column([
@@ -495,47 +643,72 @@ def main(page: ft.Page):
                 ft.Text("Cadastrar Nova Demanda", size=20, weight="bold"),
                 titulo_field,
                 descricao_field,
-                projeto_selector,
+                projeto_campo.controle,
                 cadastrar_button,
                 ft.Text("Demandas Cadastradas:", size=20, weight="bold"),
+                busca_field,
+                arquivadas_check,
                 demandas_list,
                 voltar_button
             ])
         )
 
-        listar_demandas()
+        ultima_alteracao = await db.ultima_alteracao()
+        await listar_demandas()
+        acompanhar_demandas(lista_demandas, busca_field, "Demandante", ultima_alteracao, listar_demandas)
 
-    def bolsista_page():
+    async def bolsista_page():
         limpar_tela()
 
-        def listar_demandas():
-            demandas = db.listar_demandas(
-                usuario_id=page.session.get("user_id"),
-                tipo_usuario="Bolsista"
-            )
-            demandas_list.controls.clear()
-            for demanda in demandas:
-                demandas_list.controls.append(
-                    ft.Text(f"{demanda[1]} - {demanda[5]} - Status: {demanda[4]}")
+        async def listar_demandas(e=None):
+            if busca_field.value:
+                demandas = await db.buscar_demandas(
+                    busca_field.value,
+                    usuario_id=page.session.get("user_id"),
+                    tipo_usuario="Bolsista"
+                )
+            else:
+                demandas = await db.listar_demandas(
+                    usuario_id=page.session.get("user_id"),
+                    tipo_usuario="Bolsista",
+                    incluir_arquivadas=arquivadas_check.value
                 )
+            lista_demandas.sincronizar(demandas)
             page.update()
 
         voltar_button = ft.ElevatedButton("Sair", on_click=login_page)
 
+        busca_field = ft.TextField(label="Buscar Demandas", on_submit=listar_demandas)
+        arquivadas_check = ft.Checkbox(label="Incluir arquivadas", on_change=listar_demandas)
         demandas_list = ft.Column()
+        lista_demandas = ListaChaveada(
+            demandas_list, lambda demanda: ft.Text(f"{demanda.titulo} - Status: {demanda.status}")
+        )
 
         page.add(
             ft.Column([
                 ft.Text("Bem-vindo(a), Bolsista", size=24, weight="bold"),
                 ft.Text("Demandas Atribuídas", size=20, weight="bold"),
+                busca_field,
+                arquivadas_check,
                 demandas_list,
                 voltar_button
             ])
         )
 
-        listar_demandas()
+        ultima_alteracao = await db.ultima_alteracao()
+        await listar_demandas()
+        acompanhar_demandas(lista_demandas, busca_field, "Bolsista", ultima_alteracao, listar_demandas)
 
     login_page()
 
 
-ft.app(target=main)
+# Ponto de entrada da interface; importar este módulo não abre a janela
+def iniciar():
+    if os.environ.get("GESTAO_INSTRUMENTACAO"):
+        instrumentacao.ativar()
+    ft.app(target=main)
+
+
+if __name__ == "__main__":
+    iniciar()
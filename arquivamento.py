@@ -0,0 +1,22 @@
+import argparse
+
+
+# Pode ser agendado (cron, agendador de tarefas) para manter a tabela de demandas só com as ativas
+def iniciar():
+    from banco_dados import Database
+
+    parser = argparse.ArgumentParser(description="Move demandas encerradas antigas para o banco de arquivo.")
+    parser.add_argument("--banco", default="gestao.db")
+    parser.add_argument("--dias", type=int, default=180, help="dias desde a última mudança de status")
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    parser.add_argument("--horas-alteracoes", type=int, default=24, help="retenção do registro de alterações")
+    args = parser.parse_args()
+
+    db = Database(args.banco)
+    total = db.arquivar_demandas(args.dias, args.tamanho_lote)
+    print(f"{total} demandas arquivadas em {db.conexoes.db_arquivo}")
+    print(f"{db.limpar_alteracoes(args.horas_alteracoes)} alterações antigas apagadas")
+
+
+if __name__ == "__main__":
+    iniciar()
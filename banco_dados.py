@@ -0,0 +1,1559 @@
+import bisect
+import heapq
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from functools import partial, wraps
+
+# Camada de dados, separada da interface para poder ser importada por scripts e serviços sem o Flet.
+# asyncio, concurrent.futures, hashlib, logging e json só são importados quando usados.
+
+# Migrações do esquema: cada posição da lista é uma versão (PRAGMA user_version)
+MIGRACOES = [
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            senha TEXT NOT NULL,
+            tipo TEXT NOT NULL CHECK(tipo IN ('Administrador', 'Demandante', 'Bolsista'))
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS demandas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            solicitante_id INTEGER,
+            projeto_id INTEGER,
+            status TEXT DEFAULT 'Pendente',
+            bolsista_id INTEGER,
+            FOREIGN KEY (solicitante_id) REFERENCES usuarios (id),
+            FOREIGN KEY (projeto_id) REFERENCES projetos (id),
+            FOREIGN KEY (bolsista_id) REFERENCES usuarios (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS projetos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            area TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS projeto_usuarios (
+            projeto_id INTEGER,
+            usuario_id INTEGER,
+            PRIMARY KEY (projeto_id, usuario_id),
+            FOREIGN KEY (projeto_id) REFERENCES projetos (id),
+            FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+        )
+        ''',
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_demandas_solicitante ON demandas (solicitante_id)",
+        "CREATE INDEX IF NOT EXISTS idx_demandas_bolsista ON demandas (bolsista_id)",
+        "CREATE INDEX IF NOT EXISTS idx_usuarios_tipo ON usuarios (tipo, nome, email)",
+        "CREATE INDEX IF NOT EXISTS idx_projeto_usuarios_usuario ON projeto_usuarios (usuario_id, projeto_id)",
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_demandas_status ON demandas (status)",
+        "CREATE INDEX IF NOT EXISTS idx_demandas_projeto ON demandas (projeto_id)",
+    ],
+    [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS demandas_fts USING fts5(
+            titulo, descricao, content='demandas', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS demandas_fts_insercao AFTER INSERT ON demandas BEGIN
+            INSERT INTO demandas_fts (rowid, titulo, descricao) VALUES (NEW.id, NEW.titulo, NEW.descricao);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS demandas_fts_remocao AFTER DELETE ON demandas BEGIN
+            INSERT INTO demandas_fts (demandas_fts, rowid, titulo, descricao) VALUES ('delete', OLD.id, OLD.titulo, OLD.descricao);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS demandas_fts_atualizacao AFTER UPDATE OF titulo, descricao ON demandas BEGIN
+            INSERT INTO demandas_fts (demandas_fts, rowid, titulo, descricao) VALUES ('delete', OLD.id, OLD.titulo, OLD.descricao);
+            INSERT INTO demandas_fts (rowid, titulo, descricao) VALUES (NEW.id, NEW.titulo, NEW.descricao);
+        END
+        ''',
+        "INSERT INTO demandas_fts (demandas_fts) VALUES ('rebuild')",
+    ],
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS alteracoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            demanda_id INTEGER NOT NULL,
+            criado_em TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS alteracoes_insercao AFTER INSERT ON demandas BEGIN
+            INSERT INTO alteracoes (demanda_id) VALUES (NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS alteracoes_atualizacao
+        AFTER UPDATE OF titulo, descricao, solicitante_id, projeto_id, status, bolsista_id ON demandas BEGIN
+            INSERT INTO alteracoes (demanda_id) VALUES (NEW.id);
+        END
+        ''',
+    ],
+    [
+        # Contagens mantidas por triggers; demandas sem projeto ficam em projeto_id = 0
+        '''
+        CREATE TABLE IF NOT EXISTS resumo_projeto_status (
+            projeto_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (projeto_id, status)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS resumo_bolsista_status (
+            bolsista_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (bolsista_id, status)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS resumo_insercao AFTER INSERT ON demandas BEGIN
+            INSERT INTO resumo_projeto_status VALUES (COALESCE(NEW.projeto_id, 0), COALESCE(NEW.status, ''), 1)
+                ON CONFLICT (projeto_id, status) DO UPDATE SET total = total + 1;
+            INSERT INTO resumo_bolsista_status SELECT NEW.bolsista_id, COALESCE(NEW.status, ''), 1 WHERE NEW.bolsista_id IS NOT NULL
+                ON CONFLICT (bolsista_id, status) DO UPDATE SET total = total + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS resumo_remocao AFTER DELETE ON demandas BEGIN
+            UPDATE resumo_projeto_status SET total = total - 1
+                WHERE projeto_id = COALESCE(OLD.projeto_id, 0) AND status = COALESCE(OLD.status, '');
+            UPDATE resumo_bolsista_status SET total = total - 1
+                WHERE bolsista_id = OLD.bolsista_id AND status = COALESCE(OLD.status, '');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS resumo_atualizacao AFTER UPDATE OF projeto_id, status, bolsista_id ON demandas BEGIN
+            UPDATE resumo_projeto_status SET total = total - 1
+                WHERE projeto_id = COALESCE(OLD.projeto_id, 0) AND status = COALESCE(OLD.status, '');
+            UPDATE resumo_bolsista_status SET total = total - 1
+                WHERE bolsista_id = OLD.bolsista_id AND status = COALESCE(OLD.status, '');
+            INSERT INTO resumo_projeto_status VALUES (COALESCE(NEW.projeto_id, 0), COALESCE(NEW.status, ''), 1)
+                ON CONFLICT (projeto_id, status) DO UPDATE SET total = total + 1;
+            INSERT INTO resumo_bolsista_status SELECT NEW.bolsista_id, COALESCE(NEW.status, ''), 1 WHERE NEW.bolsista_id IS NOT NULL
+                ON CONFLICT (bolsista_id, status) DO UPDATE SET total = total + 1;
+        END
+        ''',
+        '''
+        INSERT INTO resumo_projeto_status
+        SELECT COALESCE(projeto_id, 0), COALESCE(status, ''), COUNT(*) FROM demandas GROUP BY 1, 2
+        ''',
+        '''
+        INSERT INTO resumo_bolsista_status
+        SELECT bolsista_id, COALESCE(status, ''), COUNT(*) FROM demandas WHERE bolsista_id IS NOT NULL GROUP BY 1, 2
+        ''',
+    ],
+    [
+        # Um trigger por resumo, disparado só quando a chave dele muda (atribuir não mexe no resumo por projeto)
+        "DROP TRIGGER IF EXISTS resumo_atualizacao",
+        '''
+        CREATE TRIGGER IF NOT EXISTS resumo_projeto_atualizacao AFTER UPDATE OF projeto_id, status ON demandas
+        WHEN OLD.projeto_id IS NOT NEW.projeto_id OR OLD.status IS NOT NEW.status BEGIN
+            UPDATE resumo_projeto_status SET total = total - 1
+                WHERE projeto_id = COALESCE(OLD.projeto_id, 0) AND status = COALESCE(OLD.status, '');
+            INSERT INTO resumo_projeto_status VALUES (COALESCE(NEW.projeto_id, 0), COALESCE(NEW.status, ''), 1)
+                ON CONFLICT (projeto_id, status) DO UPDATE SET total = total + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS resumo_bolsista_atualizacao AFTER UPDATE OF bolsista_id, status ON demandas
+        WHEN OLD.bolsista_id IS NOT NEW.bolsista_id OR OLD.status IS NOT NEW.status BEGIN
+            UPDATE resumo_bolsista_status SET total = total - 1
+                WHERE bolsista_id = OLD.bolsista_id AND status = COALESCE(OLD.status, '');
+            INSERT INTO resumo_bolsista_status SELECT NEW.bolsista_id, COALESCE(NEW.status, ''), 1 WHERE NEW.bolsista_id IS NOT NULL
+                ON CONFLICT (bolsista_id, status) DO UPDATE SET total = total + 1;
+        END
+        ''',
+    ],
+    [
+        # Índices NOCASE para as sugestões por prefixo dos campos de busca
+        "CREATE INDEX IF NOT EXISTS idx_usuarios_tipo_nome ON usuarios (tipo, nome COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_projetos_nome ON projetos (nome COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_demandas_titulo ON demandas (titulo COLLATE NOCASE)",
+    ],
+    [
+        # Momento da última mudança de status, usado para arquivar demandas encerradas há muito tempo.
+        # Demandas que nunca mudaram de status são preenchidas pela migração da inserção, mais abaixo
+        "ALTER TABLE demandas ADD COLUMN atualizado_em TEXT",
+        '''
+        CREATE TRIGGER IF NOT EXISTS demandas_atualizado_em AFTER UPDATE OF status ON demandas
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            UPDATE demandas SET atualizado_em = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        ''',
+        '''
+        UPDATE demandas SET atualizado_em = ultima.criado_em
+        FROM (SELECT demanda_id, MAX(criado_em) AS criado_em FROM alteracoes GROUP BY demanda_id) AS ultima
+        WHERE ultima.demanda_id = demandas.id
+        ''',
+    ],
+    [
+        # Histórico de status só de inserção, gravado pelos triggers na mesma transação da alteração.
+        # status_anterior NULL marca a criação da demanda; ts é o dia juliano (julianday), que as
+        # consultas comparam e subtraem sem converter texto linha a linha. criada_em repete o ts da
+        # criação em cada linha para o tempo de entrega não precisar de uma busca por demanda, e fica
+        # NULL quando a criação não é conhecida (demandas anteriores ao histórico)
+        '''
+        CREATE TABLE IF NOT EXISTS transicoes_status (
+            id INTEGER PRIMARY KEY,
+            demanda_id INTEGER NOT NULL,
+            status_anterior TEXT,
+            status_novo TEXT,
+            ts REAL NOT NULL DEFAULT (julianday('now')),
+            criada_em REAL
+        )
+        ''',
+        # Índices de cobertura: as consultas de indicadores não precisam ler a tabela
+        "CREATE INDEX IF NOT EXISTS idx_transicoes_demanda_ts ON transicoes_status (demanda_id, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_transicoes_ts ON transicoes_status (ts, demanda_id, status_novo)",
+        # Só mudanças de status: a linha de criação não é uma chegada ao status, mesmo que a demanda
+        # já tenha sido inserida como Entregue (importação). status_anterior vai no fim para o índice
+        # continuar cobrindo a consulta, que repete a condição
+        "CREATE INDEX IF NOT EXISTS idx_transicoes_status_ts "
+        "ON transicoes_status (status_novo, ts, demanda_id, criada_em, status_anterior) WHERE status_anterior IS NOT NULL",
+        '''
+        CREATE TRIGGER IF NOT EXISTS transicoes_insercao AFTER INSERT ON demandas BEGIN
+            INSERT INTO transicoes_status (demanda_id, status_anterior, status_novo, criada_em)
+            VALUES (NEW.id, NULL, NEW.status, julianday('now'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS transicoes_atualizacao AFTER UPDATE OF status ON demandas
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            INSERT INTO transicoes_status (demanda_id, status_anterior, status_novo, criada_em)
+            VALUES (NEW.id, OLD.status, NEW.status, (
+                SELECT criada_em FROM transicoes_status WHERE demanda_id = NEW.id ORDER BY ts LIMIT 1
+            ));
+        END
+        ''',
+        # Das demandas existentes só se conhece o status atual, registrado em atualizado_em. A criação
+        # fica desconhecida (criada_em NULL) e elas não entram no tempo de entrega
+        '''
+        INSERT INTO transicoes_status (demanda_id, status_anterior, status_novo, ts, criada_em)
+        SELECT id, NULL, status, julianday(COALESCE(atualizado_em, 'now')), NULL
+        FROM demandas
+        ''',
+    ],
+    [
+        # atualizado_em também na inserção: demandas importadas já encerradas ficavam NULL e eram
+        # arquivadas na execução seguinte, qualquer que fosse o prazo. As que ainda estão NULL
+        # contam a partir desta migração
+        '''
+        CREATE TRIGGER IF NOT EXISTS demandas_atualizado_em_insercao AFTER INSERT ON demandas
+        WHEN NEW.atualizado_em IS NULL BEGIN
+            UPDATE demandas SET atualizado_em = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        ''',
+        "UPDATE demandas SET atualizado_em = CURRENT_TIMESTAMP WHERE atualizado_em IS NULL",
+    ],
+    [
+        # Índices de prefixo de 2 e 3 letras para as buscas "termo"* com poucas letras digitadas.
+        # O conteúdo fica em demandas, então basta recriar o índice e reconstruí-lo
+        "DROP TABLE IF EXISTS demandas_fts",
+        '''
+        CREATE VIRTUAL TABLE demandas_fts USING fts5(
+            titulo, descricao, content='demandas', content_rowid='id', tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        ''',
+        "INSERT INTO demandas_fts (demandas_fts) VALUES ('rebuild')",
+    ],
+    [
+        # Enquanto atribuicao_em_lote tem uma linha, os triggers por linha de alteracoes e do resumo por
+        # bolsista não disparam: distribuir_demandas grava os dois por conjunto, na mesma transação
+        "CREATE TABLE IF NOT EXISTS atribuicao_em_lote (ativa INTEGER NOT NULL)",
+        "DROP TRIGGER IF EXISTS alteracoes_atualizacao",
+        '''
+        CREATE TRIGGER alteracoes_atualizacao
+        AFTER UPDATE OF titulo, descricao, solicitante_id, projeto_id, status, bolsista_id ON demandas
+        WHEN NOT EXISTS (SELECT 1 FROM atribuicao_em_lote) BEGIN
+            INSERT INTO alteracoes (demanda_id) VALUES (NEW.id);
+        END
+        ''',
+        "DROP TRIGGER IF EXISTS resumo_bolsista_atualizacao",
+        '''
+        CREATE TRIGGER resumo_bolsista_atualizacao AFTER UPDATE OF bolsista_id, status ON demandas
+        WHEN (OLD.bolsista_id IS NOT NEW.bolsista_id OR OLD.status IS NOT NEW.status)
+        AND NOT EXISTS (SELECT 1 FROM atribuicao_em_lote) BEGIN
+            UPDATE resumo_bolsista_status SET total = total - 1
+                WHERE bolsista_id = OLD.bolsista_id AND status = COALESCE(OLD.status, '');
+            INSERT INTO resumo_bolsista_status SELECT NEW.bolsista_id, COALESCE(NEW.status, ''), 1 WHERE NEW.bolsista_id IS NOT NULL
+                ON CONFLICT (bolsista_id, status) DO UPDATE SET total = total + 1;
+        END
+        ''',
+    ],
+    [
+        # Sessões de demandante e bolsista procuram alterações só nas próprias demandas
+        "CREATE INDEX IF NOT EXISTS idx_alteracoes_demanda ON alteracoes (demanda_id, id)",
+    ],
+]
+
+# Banco de arquivo (<banco>_arquivo.db), anexado como "arquivo" em todas as conexões. Fica fora das
+# migrações porque pode ser criado, movido ou apagado independentemente do banco principal
+ESQUEMA_ARQUIVO = [
+    '''
+    CREATE TABLE IF NOT EXISTS arquivo.demandas (
+        id INTEGER PRIMARY KEY,
+        titulo TEXT NOT NULL,
+        descricao TEXT,
+        solicitante_id INTEGER,
+        projeto_id INTEGER,
+        status TEXT,
+        bolsista_id INTEGER,
+        atualizado_em TEXT,
+        arquivado_em TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_demandas_solicitante ON demandas (solicitante_id)",
+    "CREATE INDEX IF NOT EXISTS arquivo.idx_demandas_bolsista ON demandas (bolsista_id)",
+]
+STATUS_ENCERRADOS = ("Entregue", "Recusada")
+
+# Conexões compartilhadas por processo: um escritor serializado e um pool limitado de leitores
+class GerenciadorConexoes:
+    _instancias = {}
+    _instancias_lock = threading.Lock()
+    rastreador = None
+
+    @classmethod
+    def obter(cls, db_name):
+        with cls._instancias_lock:
+            if db_name not in cls._instancias:
+                cls._instancias[db_name] = cls(db_name)
+            return cls._instancias[db_name]
+
+    @classmethod
+    def definir_rastreador(cls, rastreador):
+        with cls._instancias_lock:
+            cls.rastreador = rastreador
+            for gerenciador in cls._instancias.values():
+                for conn in gerenciador._conexoes:
+                    conn.set_trace_callback(rastreador)
+
+    def __init__(self, db_name, max_leitores=4, timeout=5.0):
+        self.db_name = db_name
+        self.db_arquivo = os.path.splitext(db_name)[0] + "_arquivo.db"
+        self.max_leitores = max_leitores
+        self.timeout = timeout
+        self._conexoes = []
+        # Conexões que já têm o arquivo anexado (ver anexar_arquivo)
+        self._com_arquivo = set()
+        self.arquivo_anexado = False
+        self._escritor = self._conectar()
+        self._escritor.execute("PRAGMA journal_mode = WAL")
+        self._escritor.execute("PRAGMA synchronous = NORMAL")
+        self._escrita_lock = threading.Lock()
+        self._leitores_livres = queue.LifoQueue()
+        self._leitores_criados = 0
+        self._leitores_lock = threading.Lock()
+        # Indica que o esquema já foi conferido neste processo
+        self.esquema_pronto = False
+        # Esperas por tipo: [ocorrências, tempo total (s), maior espera (s)]
+        self._esperas = {"escrita": [0, 0.0, 0.0], "leitura": [0, 0.0, 0.0]}
+        self._esperas_lock = threading.Lock()
+
+    def _conectar(self, somente_leitura=False):
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        if somente_leitura:
+            conn.execute("PRAGMA query_only = ON")
+        conn.set_trace_callback(GerenciadorConexoes.rastreador)
+        self._conexoes.append(conn)
+        return conn
+
+    def _obter_leitor(self):
+        try:
+            return self._leitores_livres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._leitores_lock:
+            if self._leitores_criados < self.max_leitores:
+                self._leitores_criados += 1
+                return self._conectar(somente_leitura=True)
+        inicio = time.perf_counter()
+        try:
+            return self._leitores_livres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Nenhuma conexão de leitura disponível")
+        finally:
+            self._registrar_espera("leitura", time.perf_counter() - inicio)
+
+    # O arquivo só é anexado depois das migrações. Uma conexão que leu o esquema do banco principal
+    # antes de ele ter a tabela demandas resolveria "demandas" para arquivo.demandas, e como o comando
+    # não usa o banco principal, a mudança no esquema dele não seria percebida; por isso o esquema
+    # principal é relido antes do ATTACH. O escritor é anexado aqui e cada leitor quando sai do pool
+    def anexar_arquivo(self):
+        with self._escrita_lock:
+            if self.arquivo_anexado:
+                return
+            self._anexar(self._escritor)
+            self._escritor.execute("PRAGMA arquivo.journal_mode = WAL")
+            for comando in ESQUEMA_ARQUIVO:
+                self._escritor.execute(comando)
+            self.arquivo_anexado = True
+
+    def _anexar(self, conn):
+        conn.execute("SELECT 1 FROM main.sqlite_master LIMIT 1").fetchall()
+        conn.execute("ATTACH DATABASE ? AS arquivo", (self.db_arquivo,))
+        self._com_arquivo.add(conn)
+
+    def _registrar_espera(self, tipo, duracao):
+        with self._esperas_lock:
+            espera = self._esperas[tipo]
+            espera[0] += 1
+            espera[1] += duracao
+            espera[2] = max(espera[2], duracao)
+
+    # Escrita: toda transação entra na contagem, com o tempo até obter o lock e o BEGIN IMMEDIATE.
+    # Leitura: só as vezes em que o pool estava esgotado e foi preciso esperar um leitor livre
+    def estatisticas_esperas(self):
+        with self._esperas_lock:
+            return {
+                tipo: {"ocorrencias": total, "espera_total_ms": soma * 1000, "espera_maxima_ms": maxima * 1000}
+                for tipo, (total, soma, maxima) in self._esperas.items()
+            }
+
+    def zerar_esperas(self):
+        with self._esperas_lock:
+            self._esperas = {tipo: [0, 0.0, 0.0] for tipo in self._esperas}
+
+    @contextmanager
+    def leitura(self):
+        conn = self._obter_leitor()
+        try:
+            if self.arquivo_anexado and conn not in self._com_arquivo:
+                self._anexar(conn)
+            yield conn
+        finally:
+            self._leitores_livres.put(conn)
+
+    @contextmanager
+    def escrita(self):
+        inicio = time.perf_counter()
+        with self._escrita_lock:
+            self._escritor.execute("BEGIN IMMEDIATE")
+            self._registrar_espera("escrita", time.perf_counter() - inicio)
+            with self._escritor:
+                yield self._escritor
+
+# Cache de leitura compartilhado pelo processo, com limite de itens (LRU) e expiração por tempo
+class CacheLeitura:
+    def __init__(self, max_itens=256, ttl=300.0):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave, carregar):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] > time.monotonic():
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[1]
+            self.falhas += 1
+            geracao = self._geracao
+        valor = carregar()
+        with self._lock:
+            # Uma invalidação durante a carga torna o valor possivelmente desatualizado
+            if geracao == self._geracao:
+                self._itens[chave] = (time.monotonic() + self.ttl, valor)
+                self._itens.move_to_end(chave)
+                while len(self._itens) > self.max_itens:
+                    self._itens.popitem(last=False)
+        return valor
+
+    def invalidar(self, grupo):
+        with self._lock:
+            self._geracao += 1
+            for chave in [chave for chave in self._itens if chave[0] == grupo]:
+                del self._itens[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            return {"acertos": self.acertos, "falhas": self.falhas, "itens": len(self._itens)}
+
+
+cache_consultas = CacheLeitura()
+
+# Senhas: hash scrypt no formato "scrypt$n$r$p$sal$hash" (sal e hash em base64). O cálculo roda em um
+# pool limitado para que picos de login não ocupem todos os núcleos nem a memória (n * r * 128 bytes cada)
+class VerificadorSenhas:
+    PREFIXO = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1, max_workers=2):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.max_workers = max_workers
+        self._executor = None
+        self._ficticia = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gestao-senhas")
+            return self._executor
+
+    # Confere o formato completo, para que um valor importado como "scrypt$..." malformado não chegue
+    # ao login; hashlib.scrypt exige n potência de 2 maior que 1
+    def eh_hash(self, armazenada):
+        import base64
+
+        partes = armazenada.split("$")
+        if len(partes) != 6 or partes[0] != self.PREFIXO:
+            return False
+        try:
+            n, r, p = (int(parte) for parte in partes[1:4])
+            for parte in partes[4:]:
+                base64.b64decode(parte, validate=True)
+        except ValueError:
+            return False
+        return n > 1 and n & (n - 1) == 0 and r > 0 and p > 0
+
+    def precisa_atualizar(self, armazenada):
+        return not armazenada.startswith(f"{self.PREFIXO}${self.n}${self.r}${self.p}$")
+
+    def _derivar(self, senha, sal, n, r, p):
+        import hashlib
+
+        return hashlib.scrypt(senha.encode("utf-8"), salt=sal, n=n, r=r, p=p, dklen=32)
+
+    def _gerar(self, senha):
+        import base64
+
+        sal = os.urandom(16)
+        chave = self._derivar(senha, sal, self.n, self.r, self.p)
+        return "$".join((
+            self.PREFIXO, str(self.n), str(self.r), str(self.p),
+            base64.b64encode(sal).decode("ascii"), base64.b64encode(chave).decode("ascii")
+        ))
+
+    def _verificar(self, senha, armazenada):
+        import base64
+        import hmac
+
+        if not armazenada.startswith(f"{self.PREFIXO}$"):
+            # Senha antiga em texto puro, ainda não migrada
+            return hmac.compare_digest(senha.encode("utf-8"), armazenada.encode("utf-8"))
+        if not self.eh_hash(armazenada):
+            return False
+        _, n, r, p, sal, chave = armazenada.split("$")
+        try:
+            calculada = self._derivar(senha, base64.b64decode(sal), int(n), int(r), int(p))
+        except ValueError:
+            # Parâmetros acima do limite de memória do scrypt
+            return False
+        return hmac.compare_digest(calculada, base64.b64decode(chave))
+
+    def gerar(self, senha):
+        return self._pool().submit(self._gerar, senha).result()
+
+    def gerar_varias(self, senhas):
+        return list(self._pool().map(self._gerar, senhas))
+
+    def verificar(self, senha, armazenada):
+        return self._pool().submit(self._verificar, senha, armazenada).result()
+
+    # Hash usado quando o e-mail não existe, para que a resposta leve o mesmo tempo
+    def ficticia(self):
+        if self._ficticia is None:
+            self._ficticia = self.gerar("")
+        return self._ficticia
+
+    # Versões para a fachada assíncrona: quem espera o pool é o event loop, não uma thread do banco
+    async def gerar_async(self, senha):
+        import asyncio
+
+        return await asyncio.wrap_future(self._pool().submit(self._gerar, senha))
+
+    async def verificar_async(self, senha, armazenada):
+        import asyncio
+
+        return await asyncio.wrap_future(self._pool().submit(self._verificar, senha, armazenada))
+
+    async def ficticia_async(self):
+        if self._ficticia is None:
+            self._ficticia = await self.gerar_async("")
+        return self._ficticia
+
+
+# Falhas de login recentes por e-mail: ao atingir max_falhas, novas tentativas são recusadas sem
+# calcular hash até passar a janela desde a última falha. Acima de max_emails, os mais antigos saem
+class ControleTentativas:
+    def __init__(self, max_falhas=5, janela=300.0, max_emails=10000):
+        self.max_falhas = max_falhas
+        self.janela = janela
+        self.max_emails = max_emails
+        self._falhas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bloqueado(self, email):
+        chave = email.strip().lower()
+        with self._lock:
+            item = self._falhas.get(chave)
+            if item is None:
+                return False
+            if item[1] <= time.monotonic():
+                del self._falhas[chave]
+                return False
+            return item[0] >= self.max_falhas
+
+    def registrar_falha(self, email):
+        chave = email.strip().lower()
+        agora = time.monotonic()
+        with self._lock:
+            falhas, expira_em = self._falhas.pop(chave, (0, agora))
+            if expira_em <= agora:
+                falhas = 0
+            self._falhas[chave] = (falhas + 1, agora + self.janela)
+            while len(self._falhas) > self.max_emails:
+                self._falhas.popitem(last=False)
+
+    def limpar(self, email):
+        with self._lock:
+            self._falhas.pop(email.strip().lower(), None)
+
+
+verificador_senhas = VerificadorSenhas()
+controle_tentativas = ControleTentativas()
+
+# Resultado da verificação de senha no login, compartilhado pelas versões síncrona e assíncrona
+def _login_aceito(email, linha, valida):
+    if not valida or linha is None:
+        controle_tentativas.registrar_falha(email)
+        return False
+    controle_tentativas.limpar(email)
+    return True
+
+# Registros devolvidos pelas consultas; as listagens usam DemandaResumo, sem a descrição
+Usuario = namedtuple("Usuario", "id nome email tipo")
+Projeto = namedtuple("Projeto", "id nome area")
+Demanda = namedtuple("Demanda", "id titulo descricao solicitante_id projeto_id status bolsista_id")
+DemandaResumo = namedtuple("DemandaResumo", "id titulo solicitante_id projeto_id status bolsista_id")
+Sugestao = namedtuple("Sugestao", "id texto")
+Percentil = namedtuple("Percentil", "percentil horas")
+Vazao = namedtuple("Vazao", "periodo total acumulado")
+TempoStatus = namedtuple("TempoStatus", "status transicoes media_horas maximo_horas")
+
+FORMATOS_PERIODO = {"dia": "%Y-%m-%d", "semana": "%Y-%W", "mes": "%Y-%m"}
+
+COLUNAS_DEMANDA_RESUMO = "id, titulo, solicitante_id, projeto_id, status, bolsista_id"
+LIMITE_RELEVANCIA_BUSCA = 5000
+
+
+def _consultar(conn, tipo, sql, parametros=()):
+    cursor = conn.cursor()
+    cursor.row_factory = lambda _, linha: tipo._make(linha)
+    return cursor.execute(sql, parametros)
+
+
+# Importação e exportação em massa: campos aceitos por tabela como (coluna, conversor, obrigatório)
+STATUS_DEMANDA = ("Recusada", "Pendente", "Em Andamento", "Concluída", "Entregue")
+
+
+def _campo_texto(valor):
+    valor = "" if valor is None else str(valor).strip()
+    return valor or None
+
+
+def _campo_inteiro(valor):
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, (bool, float)):
+        raise ValueError(valor)
+    return int(valor)
+
+
+# Hashes scrypt são importados como estão; um valor com o prefixo mas malformado é recusado
+def _campo_senha(valor):
+    valor = _campo_texto(valor)
+    if valor and valor.startswith(f"{VerificadorSenhas.PREFIXO}$") and not verificador_senhas.eh_hash(valor):
+        raise ValueError(valor)
+    return valor
+
+
+def _campo_status(valor):
+    valor = _campo_texto(valor) or "Pendente"
+    if valor not in STATUS_DEMANDA:
+        raise ValueError(valor)
+    return valor
+
+
+CAMPOS_IMPORTACAO = {
+    "usuarios": (
+        ("id", _campo_inteiro, False), ("nome", _campo_texto, True), ("email", _campo_texto, True),
+        ("senha", _campo_senha, True), ("tipo", _campo_texto, True),
+    ),
+    "projetos": (("id", _campo_inteiro, False), ("nome", _campo_texto, True), ("area", _campo_texto, True)),
+    "demandas": (
+        ("id", _campo_inteiro, False), ("titulo", _campo_texto, True), ("descricao", _campo_texto, False),
+        ("solicitante_id", _campo_inteiro, True), ("projeto_id", _campo_inteiro, False),
+        ("status", _campo_status, True), ("bolsista_id", _campo_inteiro, False),
+    ),
+}
+# A senha não é exportada
+COLUNAS_EXPORTACAO = {
+    "usuarios": ("id", "nome", "email", "tipo"),
+    "projetos": ("id", "nome", "area"),
+    "demandas": ("id", "titulo", "descricao", "solicitante_id", "projeto_id", "status", "bolsista_id"),
+}
+
+
+def _validar_registro(campos, registro):
+    if not isinstance(registro, dict):
+        raise ValueError("registro não é um objeto com as colunas da tabela")
+    valores = []
+    for coluna, conversor, obrigatorio in campos:
+        try:
+            valor = conversor(registro.get(coluna))
+        except (TypeError, ValueError):
+            raise ValueError(f"valor inválido em '{coluna}': {registro.get(coluna)!r}")
+        if valor is None and obrigatorio:
+            raise ValueError(f"campo obrigatório ausente: '{coluna}'")
+        valores.append(valor)
+    return tuple(valores)
+
+
+# Escalonador por heap: cada demanda vai para o candidato de menor carga (empate pelo menor id).
+# Com candidatos por projeto, cada projeto tem seu heap; como a carga é compartilhada entre os
+# projetos, entradas desatualizadas só são corrigidas quando chegam ao topo
+def _escalonar(demandas, carga, candidatos=None):
+    heaps = {}
+    for demanda_id, projeto_id in demandas:
+        chave = projeto_id if candidatos is not None else None
+        heap = heaps.get(chave)
+        if heap is None:
+            bolsistas = carga if candidatos is None else candidatos.get(projeto_id, ())
+            heap = heaps[chave] = [(carga[bolsista], bolsista) for bolsista in bolsistas]
+            heapq.heapify(heap)
+        if not heap:
+            continue
+        while heap[0][0] != carga[heap[0][1]]:
+            heapq.heapreplace(heap, (carga[heap[0][1]], heap[0][1]))
+        bolsista = heap[0][1]
+        carga[bolsista] += 1
+        heapq.heapreplace(heap, (carga[bolsista], bolsista))
+        yield bolsista, demanda_id
+
+# Banco de Dados
+class Database:
+    def __init__(self, db_name="gestao.db", publicar=None):
+        self.conexoes = GerenciadorConexoes.obter(db_name)
+        self.publicar = publicar
+        if not self.conexoes.esquema_pronto:
+            self.create_tables()
+            self.conexoes.anexar_arquivo()
+            self.limpar_alteracoes()
+            self.conexoes.esquema_pronto = True
+
+    # Só abre a transação de escrita quando há migração pendente
+    def create_tables(self):
+        with self.conexoes.leitura() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRACOES):
+                return
+        with self.conexoes.escrita() as conn:
+            versao_atual = conn.execute("PRAGMA user_version").fetchone()[0]
+            for versao, comandos in enumerate(MIGRACOES[versao_atual:], start=versao_atual + 1):
+                for comando in comandos:
+                    conn.execute(comando)
+                conn.execute(f"PRAGMA user_version = {versao}")
+
+    def estatisticas_cache(self):
+        return cache_consultas.estatisticas()
+
+    def estatisticas_esperas(self):
+        return self.conexoes.estatisticas_esperas()
+
+    # Cadastro e login são divididos em passos de banco (inserir_usuario, buscar_credenciais,
+    # regravar_senha) e de hash, para que AsyncDatabase espere o hash sem ocupar uma thread do banco.
+    # O hash é calculado antes de abrir a transação para não segurar a escrita
+    def adicionar_usuario(self, nome, email, senha, tipo):
+        self.inserir_usuario(nome, email, verificador_senhas.gerar(senha), tipo)
+
+    def inserir_usuario(self, nome, email, senha_hash, tipo):
+        with self.conexoes.escrita() as conn:
+            conn.execute(
+                "INSERT INTO usuarios (nome, email, senha, tipo) VALUES (?, ?, ?, ?)", (nome, email, senha_hash, tipo)
+            )
+        cache_consultas.invalidar("usuarios")
+
+    # Busca pelo e-mail (índice único) e verifica a senha fora da conexão; senhas ainda em texto puro
+    # ou com parâmetros antigos são regravadas com o hash atual no primeiro login bem-sucedido
+    def validar_usuario(self, email, senha):
+        if controle_tentativas.bloqueado(email):
+            return None
+        linha = self.buscar_credenciais(email)
+        armazenada = linha[4] if linha else verificador_senhas.ficticia()
+        if not _login_aceito(email, linha, verificador_senhas.verificar(senha, armazenada)):
+            return None
+        if verificador_senhas.precisa_atualizar(armazenada):
+            self.regravar_senha(linha[0], armazenada, verificador_senhas.gerar(senha))
+        return Usuario._make(linha[:4])
+
+    def buscar_credenciais(self, email):
+        with self.conexoes.leitura() as conn:
+            return conn.execute(
+                "SELECT id, nome, email, tipo, senha FROM usuarios WHERE email = ?", (email,)
+            ).fetchone()
+
+    # Só regrava se a senha não mudou desde a leitura
+    def regravar_senha(self, usuario_id, anterior, nova):
+        with self.conexoes.escrita() as conn:
+            conn.execute("UPDATE usuarios SET senha = ? WHERE id = ? AND senha = ?", (nova, usuario_id, anterior))
+
+    # Por padrão lista só a tabela ativa; com incluir_arquivadas, junta as demandas do arquivo
+    def listar_demandas(self, usuario_id=None, tipo_usuario=None, incluir_arquivadas=False):
+        if tipo_usuario == "Demandante":
+            filtro, parametros = "WHERE solicitante_id = ?", (usuario_id,)
+        elif tipo_usuario == "Bolsista":
+            filtro, parametros = "WHERE bolsista_id = ?", (usuario_id,)
+        elif tipo_usuario == "Administrador":
+            filtro, parametros = "", ()
+        else:
+            return []
+        sql = f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas {filtro}"
+        if incluir_arquivadas:
+            sql += f" UNION ALL SELECT {COLUNAS_DEMANDA_RESUMO} FROM arquivo.demandas {filtro}"
+            parametros *= 2
+        with self.conexoes.leitura() as conn:
+            return _consultar(conn, DemandaResumo, sql, parametros).fetchall()
+
+    def listar_demandas_pagina(self, apos_id=0, limite=50, status=None, projeto_id=None,
+                               solicitante_id=None, bolsista_id=None):
+        filtros = ["id > ?"]
+        parametros = [apos_id]
+        for coluna, valor in (
+            ("status", status),
+            ("projeto_id", projeto_id),
+            ("solicitante_id", solicitante_id),
+            ("bolsista_id", bolsista_id),
+        ):
+            if valor is not None:
+                filtros.append(f"{coluna} = ?")
+                parametros.append(valor)
+        parametros.append(limite)
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, DemandaResumo,
+                f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas WHERE {' AND '.join(filtros)} ORDER BY id LIMIT ?",
+                parametros
+            ).fetchall()
+
+    def buscar_demandas(self, consulta, limite=50, usuario_id=None, tipo_usuario=None):
+        # Cada palavra vira um termo entre aspas com busca por prefixo, evitando a sintaxe do FTS5
+        termos = " ".join('"' + termo.replace('"', '""') + '"*' for termo in consulta.split())
+        if not termos:
+            return []
+        if tipo_usuario == "Administrador":
+            return self._buscar_todas_demandas(termos, limite)
+        elif tipo_usuario in ("Demandante", "Bolsista"):
+            # Parte das demandas do usuário pelo índice e só confere quais estão entre os resultados do
+            # FTS, sem calcular a relevância de todo o acervo; vêm das mais recentes para as mais antigas
+            coluna = "solicitante_id" if tipo_usuario == "Demandante" else "bolsista_id"
+            sql = (
+                f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas WHERE {coluna} = ? "
+                "AND id IN (SELECT rowid FROM demandas_fts WHERE demandas_fts MATCH ?) ORDER BY id DESC LIMIT ?"
+            )
+            parametros = (usuario_id, termos, limite)
+        else:
+            return []
+        with self.conexoes.leitura() as conn:
+            return _consultar(conn, DemandaResumo, sql, parametros).fetchall()
+
+    # A relevância (bm25) é calculada para cada resultado; acima de LIMITE_RELEVANCIA_BUSCA resultados
+    # a busca é genérica demais para a ordem importar, e vêm as mais recentes, na ordem do próprio FTS
+    def _buscar_todas_demandas(self, termos, limite):
+        with self.conexoes.leitura() as conn:
+            resultados = conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM demandas_fts WHERE demandas_fts MATCH ? LIMIT ?)",
+                (termos, LIMITE_RELEVANCIA_BUSCA + 1)
+            ).fetchone()[0]
+            ordem = "demandas_fts.rank" if resultados <= LIMITE_RELEVANCIA_BUSCA else "demandas_fts.rowid DESC"
+            return _consultar(
+                conn, DemandaResumo,
+                "SELECT d.id, d.titulo, d.solicitante_id, d.projeto_id, d.status, d.bolsista_id "
+                "FROM demandas_fts JOIN demandas d ON d.id = demandas_fts.rowid "
+                f"WHERE demandas_fts MATCH ? ORDER BY {ordem} LIMIT ?",
+                (termos, limite)
+            ).fetchall()
+
+    def resumo_demandas(self):
+        with self.conexoes.leitura() as conn:
+            return {
+                "por_status": conn.execute(
+                    "SELECT status, SUM(total) FROM resumo_projeto_status GROUP BY status HAVING SUM(total) > 0"
+                ).fetchall(),
+                "por_projeto": conn.execute(
+                    "SELECT r.projeto_id, p.nome, r.status, r.total FROM resumo_projeto_status r "
+                    "LEFT JOIN projetos p ON p.id = r.projeto_id WHERE r.total > 0 ORDER BY p.nome, r.status"
+                ).fetchall(),
+                "por_bolsista": conn.execute(
+                    "SELECT r.bolsista_id, u.nome, r.status, r.total FROM resumo_bolsista_status r "
+                    "LEFT JOIN usuarios u ON u.id = r.bolsista_id WHERE r.total > 0 ORDER BY u.nome, r.status"
+                ).fetchall(),
+            }
+
+    # Indicadores a partir de transicoes_status. Os intervalos [inicio, fim) são datas ('2024-01-01')
+    # convertidas uma vez com julianday e comparadas com ts pelo índice; os cálculos ficam no SQL
+
+    # Horas entre a criação e a primeira chegada a status_final, para as demandas com criação conhecida
+    # que chegaram nele dentro do intervalo. Cada percentil é o menor tempo cuja distribuição acumulada o alcança
+    def percentis_tempo_entrega(self, inicio="0000-01-01", fim="9999-12-31", status_final="Entregue", percentis=(0.5, 0.9, 0.95)):
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, Percentil,
+                '''
+                WITH chegadas AS (
+                    SELECT demanda_id, MIN(ts) AS ts, criada_em FROM transicoes_status
+                    WHERE status_novo = ? AND ts >= julianday(?) AND ts < julianday(?) AND status_anterior IS NOT NULL
+                    GROUP BY demanda_id
+                ),
+                duracoes AS (
+                    SELECT (ts - criada_em) * 24 AS horas FROM chegadas WHERE criada_em IS NOT NULL
+                ),
+                distribuicao AS (
+                    SELECT horas, CUME_DIST() OVER (ORDER BY horas) AS acumulado FROM duracoes
+                )
+                SELECT p.value, MIN(d.horas) FROM json_each(?) p
+                JOIN distribuicao d ON d.acumulado >= p.value
+                GROUP BY p.value ORDER BY p.value
+                ''',
+                (status_final, inicio, fim, "[" + ", ".join(str(float(p)) for p in percentis) + "]")
+            ).fetchall()
+
+    # Chegadas a um status por período, com o total acumulado no intervalo
+    def vazao_por_periodo(self, periodo="mes", inicio="0000-01-01", fim="9999-12-31", status="Entregue"):
+        if periodo not in FORMATOS_PERIODO:
+            raise ValueError(f"Período inválido: {periodo}")
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, Vazao,
+                '''
+                SELECT periodo, total, SUM(total) OVER (ORDER BY periodo) FROM (
+                    SELECT strftime(?, ts) AS periodo, COUNT(*) AS total FROM transicoes_status
+                    WHERE status_novo = ? AND ts >= julianday(?) AND ts < julianday(?) AND status_anterior IS NOT NULL
+                    GROUP BY 1
+                ) ORDER BY periodo
+                ''',
+                (FORMATOS_PERIODO[periodo], status, inicio, fim)
+            ).fetchall()
+
+    # Tempo em cada status: da transição até a próxima da mesma demanda, ou até agora se ela ainda está
+    # nele. A janela (LEAD) cobre só as transições do intervalo; a última de cada demanda no intervalo
+    # busca a seguinte pelo índice (demanda_id, ts)
+    def tempo_em_status(self, inicio="0000-01-01", fim="9999-12-31"):
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, TempoStatus,
+                '''
+                WITH periodos AS (
+                    SELECT demanda_id, status_novo, ts,
+                        LEAD(ts) OVER (PARTITION BY demanda_id ORDER BY ts) AS saida
+                    FROM transicoes_status WHERE ts >= julianday(?) AND ts < julianday(?)
+                ),
+                duracoes AS MATERIALIZED (
+                    SELECT status_novo, COALESCE(saida, (
+                        SELECT MIN(seguinte.ts) FROM transicoes_status seguinte
+                        WHERE seguinte.demanda_id = periodos.demanda_id AND seguinte.ts > periodos.ts
+                    ), julianday('now')) - ts AS duracao
+                    FROM periodos
+                )
+                SELECT status_novo, COUNT(*), AVG(duracao) * 24, MAX(duracao) * 24
+                FROM duracoes GROUP BY status_novo ORDER BY status_novo
+                ''',
+                (inicio, fim)
+            ).fetchall()
+
+    def listar_usuarios(self, tipo):
+        return cache_consultas.obter(
+            ("usuarios", self.conexoes.db_name, tipo), partial(self._listar_usuarios, tipo)
+        )
+
+    def _listar_usuarios(self, tipo):
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, Usuario,
+                "SELECT id, nome, email, tipo FROM usuarios WHERE tipo = ?", (tipo,)
+            ).fetchall()
+
+    # Sugestões para os campos de busca: nomes que começam com o prefixo, sem diferenciar maiúsculas.
+    # A faixa [prefixo, prefixo + maior caractere) usa os índices NOCASE, ao contrário de LIKE
+    def _sugerir(self, sql, prefixo, limite, parametros=()):
+        prefixo = prefixo.strip()
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, Sugestao, sql, (*parametros, prefixo, prefixo + "\U0010ffff", limite)
+            ).fetchall()
+
+    def sugerir_bolsistas(self, prefixo, limite=10):
+        return self._sugerir(
+            "SELECT id, nome FROM usuarios WHERE tipo = 'Bolsista' "
+            "AND nome >= ? COLLATE NOCASE AND nome < ? COLLATE NOCASE ORDER BY nome COLLATE NOCASE LIMIT ?",
+            prefixo, limite
+        )
+
+    def sugerir_projetos(self, prefixo, limite=10):
+        return self._sugerir(
+            "SELECT id, nome FROM projetos "
+            "WHERE nome >= ? COLLATE NOCASE AND nome < ? COLLATE NOCASE ORDER BY nome COLLATE NOCASE LIMIT ?",
+            prefixo, limite
+        )
+
+    def sugerir_demandas(self, prefixo, limite=10):
+        return self._sugerir(
+            "SELECT id, titulo || ' - ' || COALESCE(status, '') FROM demandas "
+            "WHERE titulo >= ? COLLATE NOCASE AND titulo < ? COLLATE NOCASE ORDER BY titulo COLLATE NOCASE LIMIT ?",
+            prefixo, limite
+        )
+
+    def remover_usuario(self, usuario_id):
+        with self.conexoes.escrita() as conn:
+            conn.execute("DELETE FROM usuarios WHERE id = ?", (usuario_id,))
+        cache_consultas.invalidar("usuarios")
+
+    def listar_projetos(self, usuario_id=None, tipo_usuario=None):
+        if tipo_usuario != "Administrador":
+            usuario_id = None
+        return cache_consultas.obter(
+            ("projetos", self.conexoes.db_name, usuario_id, tipo_usuario),
+            partial(self._listar_projetos, usuario_id, tipo_usuario)
+        )
+
+    def _listar_projetos(self, usuario_id, tipo_usuario):
+        with self.conexoes.leitura() as conn:
+            if tipo_usuario == "Administrador":
+                return _consultar(
+                    conn, Projeto,
+                    "SELECT id, nome, area FROM projetos WHERE id IN (SELECT projeto_id FROM projeto_usuarios WHERE usuario_id = ?)",
+                    (usuario_id,)
+                ).fetchall()
+            else:
+                return _consultar(conn, Projeto, "SELECT id, nome, area FROM projetos").fetchall()
+
+    def adicionar_projeto(self, nome, area):
+        with self.conexoes.escrita() as conn:
+            projeto_id = conn.execute(
+                "INSERT INTO projetos (nome, area) VALUES (?, ?)", (nome, area)
+            ).lastrowid
+        cache_consultas.invalidar("projetos")
+        return projeto_id
+
+    def adicionar_participante_projeto(self, projeto_id, usuario_id):
+        with self.conexoes.escrita() as conn:
+            conn.execute(
+                "INSERT INTO projeto_usuarios (projeto_id, usuario_id) VALUES (?, ?)", (projeto_id, usuario_id)
+            )
+        cache_consultas.invalidar("projetos")
+
+    def remover_participante_projeto(self, projeto_id, usuario_id):
+        with self.conexoes.escrita() as conn:
+            conn.execute(
+                "DELETE FROM projeto_usuarios WHERE projeto_id = ? AND usuario_id = ?", (projeto_id, usuario_id)
+            )
+        cache_consultas.invalidar("projetos")
+
+    def cadastrar_demanda(self, titulo, descricao, solicitante_id, projeto_id):
+        with self.conexoes.escrita() as conn:
+            demanda_id = conn.execute(
+                "INSERT INTO demandas (titulo, descricao, solicitante_id, projeto_id) VALUES (?, ?, ?, ?)",
+                (titulo, descricao, solicitante_id, projeto_id)
+            ).lastrowid
+            alteracao_id = self._ultima_alteracao(conn)
+        self._publicar_alteracao(alteracao_id)
+        return demanda_id
+
+    def atualizar_status_demanda(self, demanda_id, status, bolsista_id=None):
+        with self.conexoes.escrita() as conn:
+            conn.execute(
+                "UPDATE demandas SET status = ?, bolsista_id = ? WHERE id = ?",
+                (status, bolsista_id, demanda_id)
+            )
+            alteracao_id = self._ultima_alteracao(conn)
+        self._publicar_alteracao(alteracao_id)
+
+    def atribuir_demanda(self, bolsista_id, demanda_id):
+        with self.conexoes.escrita() as conn:
+            conn.execute(
+                "UPDATE demandas SET bolsista_id = ? WHERE id = ?", (bolsista_id, demanda_id)
+            )
+            alteracao_id = self._ultima_alteracao(conn)
+        self._publicar_alteracao(alteracao_id)
+
+    # Distribui as demandas pendentes sem bolsista pela carga aberta (Pendente e Em Andamento) de cada
+    # bolsista, em uma única transação. Com somente_participantes, cada demanda só vai para bolsistas
+    # do seu projeto e as que não têm candidato continuam sem atribuição
+    def distribuir_demandas(self, projeto_id=None, somente_participantes=False):
+        filtro, parametros = ("AND projeto_id = ?", (projeto_id,)) if projeto_id is not None else ("", ())
+        with self.conexoes.escrita() as conn:
+            carga = dict(conn.execute(
+                "SELECT u.id, COALESCE(SUM(r.total), 0) FROM usuarios u "
+                "LEFT JOIN resumo_bolsista_status r "
+                "ON r.bolsista_id = u.id AND r.status IN ('Pendente', 'Em Andamento') "
+                "WHERE u.tipo = 'Bolsista' GROUP BY u.id"
+            ))
+            demandas = conn.execute(
+                f"SELECT id, projeto_id FROM demandas WHERE status = 'Pendente' AND bolsista_id IS NULL {filtro} "
+                "ORDER BY id",
+                parametros
+            ).fetchall()
+            candidatos = None
+            if somente_participantes:
+                candidatos = {}
+                for projeto, usuario_id in conn.execute("SELECT projeto_id, usuario_id FROM projeto_usuarios"):
+                    if usuario_id in carga:
+                        candidatos.setdefault(projeto, []).append(usuario_id)
+            atribuicoes = list(_escalonar(demandas, carga, candidatos))
+            if atribuicoes:
+                self._gravar_atribuicoes(conn, atribuicoes)
+            alteracao_id = self._ultima_alteracao(conn)
+        if atribuicoes:
+            self._publicar_alteracao(alteracao_id)
+        return {"atribuidas": len(atribuicoes), "sem_candidato": len(demandas) - len(atribuicoes)}
+
+    # Um UPDATE para o lote todo, com os triggers por linha desligados; alteracoes e resumo_bolsista_status
+    # recebem uma linha por demanda e uma por bolsista. As demandas eram Pendente e sem bolsista,
+    # então não há contagem anterior a descontar
+    def _gravar_atribuicoes(self, conn, atribuicoes):
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS atribuicoes (demanda_id INTEGER PRIMARY KEY, bolsista_id INTEGER NOT NULL)"
+        )
+        conn.executemany("INSERT INTO temp.atribuicoes (bolsista_id, demanda_id) VALUES (?, ?)", atribuicoes)
+        conn.execute("INSERT INTO atribuicao_em_lote VALUES (1)")
+        conn.execute(
+            "UPDATE demandas SET bolsista_id = (SELECT bolsista_id FROM temp.atribuicoes WHERE demanda_id = demandas.id) "
+            "WHERE id IN (SELECT demanda_id FROM temp.atribuicoes)"
+        )
+        conn.execute("DELETE FROM atribuicao_em_lote")
+        conn.execute("INSERT INTO alteracoes (demanda_id) SELECT demanda_id FROM temp.atribuicoes ORDER BY demanda_id")
+        conn.execute(
+            "INSERT INTO resumo_bolsista_status SELECT bolsista_id, 'Pendente', COUNT(*) FROM temp.atribuicoes "
+            "GROUP BY bolsista_id ON CONFLICT (bolsista_id, status) DO UPDATE SET total = total + excluded.total"
+        )
+        conn.execute("DELETE FROM temp.atribuicoes")
+
+    # Registro de alterações: os triggers de demandas gravam em alteracoes e, após o commit,
+    # o id mais recente é publicado para que as sessões abertas busquem só o que mudou
+    def _ultima_alteracao(self, conn):
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM alteracoes").fetchone()[0]
+
+    def _publicar_alteracao(self, alteracao_id):
+        if self.publicar:
+            self.publicar(alteracao_id)
+
+    def ultima_alteracao(self):
+        with self.conexoes.leitura() as conn:
+            return self._ultima_alteracao(conn)
+
+    # Para Demandante e Bolsista, só as demandas alteradas do usuário e, entre as que a sessão mostra
+    # (exibidas), as que deixaram de ser dele. Se parte do intervalo já foi apagada por limpar_alteracoes,
+    # devolve None no lugar das demandas e a sessão recarrega a lista inteira
+    def listar_demandas_alteradas(self, apos_alteracao_id, usuario_id=None, tipo_usuario=None, exibidas=()):
+        with self.conexoes.leitura() as conn:
+            ultima, primeira = conn.execute(
+                "SELECT (SELECT COALESCE(MAX(id), 0) FROM alteracoes), (SELECT MIN(id) FROM alteracoes)"
+            ).fetchone()
+            if primeira is not None and apos_alteracao_id < primeira - 1:
+                return ultima, None
+            alterada = "EXISTS (SELECT 1 FROM alteracoes WHERE demanda_id = demandas.id AND id > ? AND id <= ?)"
+            if tipo_usuario in ("Demandante", "Bolsista"):
+                coluna = "solicitante_id" if tipo_usuario == "Demandante" else "bolsista_id"
+                sql = (
+                    f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas WHERE {coluna} = ? AND {alterada} "
+                    f"UNION SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas "
+                    f"WHERE id IN (SELECT value FROM json_each(?)) AND {alterada} ORDER BY id"
+                )
+                parametros = (
+                    usuario_id, apos_alteracao_id, ultima,
+                    "[" + ", ".join(str(int(demanda_id)) for demanda_id in exibidas) + "]", apos_alteracao_id, ultima
+                )
+            else:
+                sql = (
+                    f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas WHERE id IN "
+                    "(SELECT demanda_id FROM alteracoes WHERE id > ? AND id <= ?) ORDER BY id"
+                )
+                parametros = (apos_alteracao_id, ultima)
+            return ultima, _consultar(conn, DemandaResumo, sql, parametros).fetchall()
+
+    # Retenção, aplicada ao abrir o banco e pelo arquivamento: apaga as alterações com mais de `horas`,
+    # sempre mantendo a mais recente para que ultima_alteracao continue crescendo. Só abre a escrita se a
+    # mais antiga já venceu; como id e criado_em crescem juntos, a busca do corte para na primeira linha recente
+    def limpar_alteracoes(self, horas=24):
+        with self.conexoes.leitura() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM alteracoes WHERE id = (SELECT MIN(id) FROM alteracoes) AND criado_em < datetime('now', ?)",
+                (f"-{horas} hours",)
+            ).fetchone():
+                return 0
+        with self.conexoes.escrita() as conn:
+            return conn.execute(
+                "DELETE FROM alteracoes WHERE id < COALESCE("
+                "(SELECT id FROM alteracoes WHERE criado_em >= datetime('now', ?) ORDER BY id LIMIT 1), "
+                "(SELECT MAX(id) FROM alteracoes))",
+                (f"-{horas} hours",)
+            ).rowcount
+
+    # Procura primeiro na tabela ativa e, se a demanda já foi arquivada, no arquivo
+    def obter_demanda(self, demanda_id):
+        colunas = "id, titulo, descricao, solicitante_id, projeto_id, status, bolsista_id"
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, Demanda,
+                f"SELECT {colunas} FROM demandas WHERE id = ? "
+                f"UNION ALL SELECT {colunas} FROM arquivo.demandas WHERE id = ? LIMIT 1",
+                (demanda_id, demanda_id)
+            ).fetchone()
+
+    def obter_demanda_resumo(self, demanda_id):
+        with self.conexoes.leitura() as conn:
+            return _consultar(
+                conn, DemandaResumo,
+                f"SELECT {COLUNAS_DEMANDA_RESUMO} FROM demandas WHERE id = ? "
+                f"UNION ALL SELECT {COLUNAS_DEMANDA_RESUMO} FROM arquivo.demandas WHERE id = ? LIMIT 1",
+                (demanda_id, demanda_id)
+            ).fetchone()
+
+    # Move demandas Entregue/Recusada sem mudança de status há mais de `dias` para o arquivo, um lote
+    # por transação para não segurar a escrita. Em WAL a gravação nos dois arquivos não é atômica em
+    # conjunto; por isso a cópia usa INSERT OR REPLACE e repetir um lote interrompido é seguro
+    def arquivar_demandas(self, dias=180, tamanho_lote=1000):
+        colunas = "id, titulo, descricao, solicitante_id, projeto_id, status, bolsista_id, atualizado_em"
+        arquivadas = 0
+        while True:
+            with self.conexoes.escrita() as conn:
+                ids = [linha[0] for linha in conn.execute(
+                    f"SELECT id FROM demandas WHERE status IN ({', '.join('?' * len(STATUS_ENCERRADOS))}) "
+                    "AND atualizado_em < datetime('now', ?) ORDER BY id LIMIT ?",
+                    (*STATUS_ENCERRADOS, f"-{dias} days", tamanho_lote)
+                )]
+                if ids:
+                    marcadores = ", ".join("?" * len(ids))
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO arquivo.demandas ({colunas}) "
+                        f"SELECT {colunas} FROM demandas WHERE id IN ({marcadores})",
+                        ids
+                    )
+                    conn.execute(f"DELETE FROM demandas WHERE id IN ({marcadores})", ids)
+            arquivadas += len(ids)
+            if len(ids) < tamanho_lote:
+                return arquivadas
+
+    def atualizar_estado_demanda(self, demanda_id, novo_estado):
+        with self.conexoes.escrita() as conn:
+            conn.execute("UPDATE demandas SET estado = ? WHERE id = ?", (novo_estado, demanda_id))
+
+    # Consome os registros sob demanda e grava um lote por transação; registros inválidos ou que
+    # violam restrições são devolvidos em "erros" como (posição do registro, mensagem)
+    def importar_registros(self, tabela, registros, tamanho_lote=5000):
+        if tabela not in CAMPOS_IMPORTACAO:
+            raise ValueError(f"Tabela não suportada: {tabela}")
+        campos = CAMPOS_IMPORTACAO[tabela]
+        sql = (
+            f"INSERT INTO {tabela} ({', '.join(coluna for coluna, _, _ in campos)}) "
+            f"VALUES ({', '.join('?' * len(campos))})"
+        )
+        inseridos, erros, lote = 0, [], []
+        for numero, registro in enumerate(registros, start=1):
+            try:
+                lote.append((numero, _validar_registro(campos, registro)))
+            except ValueError as erro:
+                erros.append((numero, str(erro)))
+            if len(lote) == tamanho_lote:
+                inseridos += self._inserir_lote(sql, self._preparar_lote(tabela, lote), erros)
+                lote = []
+        if lote:
+            inseridos += self._inserir_lote(sql, self._preparar_lote(tabela, lote), erros)
+
+        if tabela == "demandas":
+            if inseridos:
+                self._publicar_alteracao(self.ultima_alteracao())
+        else:
+            cache_consultas.invalidar(tabela)
+        erros.sort()
+        return {"inseridos": inseridos, "erros": erros}
+
+    # Senhas em texto puro viram hash no pool de senhas; valores já no formato scrypt são mantidos
+    def _preparar_lote(self, tabela, lote):
+        if tabela != "usuarios":
+            return lote
+        pendentes = [i for i, (_, valores) in enumerate(lote) if not verificador_senhas.eh_hash(valores[3])]
+        hashes = verificador_senhas.gerar_varias(lote[i][1][3] for i in pendentes)
+        for i, senha in zip(pendentes, hashes):
+            numero, valores = lote[i]
+            lote[i] = (numero, valores[:3] + (senha,) + valores[4:])
+        return lote
+
+    # Tenta o lote inteiro com executemany; se alguma linha violar uma restrição, desfaz o lote
+    # até o savepoint e insere linha a linha para identificar quais falharam
+    def _inserir_lote(self, sql, lote, erros):
+        with self.conexoes.escrita() as conn:
+            conn.execute("SAVEPOINT lote")
+            try:
+                conn.executemany(sql, [valores for _, valores in lote])
+                conn.execute("RELEASE lote")
+                return len(lote)
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK TO lote")
+                conn.execute("RELEASE lote")
+            inseridos = 0
+            for numero, valores in lote:
+                try:
+                    conn.execute(sql, valores)
+                    inseridos += 1
+                except sqlite3.IntegrityError as erro:
+                    erros.append((numero, str(erro)))
+            return inseridos
+
+    # Percorre a tabela em páginas por id, sem manter uma leitura aberta durante toda a exportação
+    def exportar_registros(self, tabela, tamanho_lote=1000):
+        if tabela not in COLUNAS_EXPORTACAO:
+            raise ValueError(f"Tabela não suportada: {tabela}")
+        colunas = COLUNAS_EXPORTACAO[tabela]
+        sql = f"SELECT {', '.join(colunas)} FROM {tabela} WHERE id > ? ORDER BY id LIMIT ?"
+        apos_id = 0
+        while True:
+            with self.conexoes.leitura() as conn:
+                pagina = conn.execute(sql, (apos_id, tamanho_lote)).fetchall()
+            for linha in pagina:
+                yield dict(zip(colunas, linha))
+            if len(pagina) < tamanho_lote:
+                return
+            apos_id = pagina[-1][0]
+
+# Instrumentação opcional: enquanto desativada, os métodos do Database não são tocados
+class Instrumentacao:
+    LIMITES_HISTOGRAMA_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+    def __init__(self, limite_lento_ms=100.0, arquivo_log="consultas_lentas.log", max_lentas=50):
+        self.limite_lento_ms = limite_lento_ms
+        self.arquivo_log = arquivo_log
+        self.ativa = False
+        self.logger = None
+        self._metricas = {}
+        self._lentas = deque(maxlen=max_lentas)
+        self._originais = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def ativar(self):
+        if self.ativa:
+            return
+        import inspect
+        import logging
+
+        self.logger = logging.getLogger("gestao.consultas_lentas")
+        if self.arquivo_log and not self.logger.handlers:
+            self.logger.addHandler(logging.FileHandler(self.arquivo_log, encoding="utf-8"))
+            self.logger.setLevel(logging.WARNING)
+        for nome, metodo in list(vars(Database).items()):
+            if callable(metodo) and not nome.startswith("_"):
+                self._originais[nome] = metodo
+                medir = self._medir_gerador if inspect.isgeneratorfunction(metodo) else self._medir
+                setattr(Database, nome, medir(nome, metodo))
+        GerenciadorConexoes.definir_rastreador(self._registrar_comando)
+        self.ativa = True
+
+    def desativar(self):
+        if not self.ativa:
+            return
+        GerenciadorConexoes.definir_rastreador(None)
+        for nome, metodo in self._originais.items():
+            setattr(Database, nome, metodo)
+        self._originais.clear()
+        self.ativa = False
+
+    # O rastreador recebe o comando de nível superior de novo a cada passo de trigger (e a cada linha de
+    # um executemany); repetições seguidas são guardadas uma vez só
+    def _registrar_comando(self, sql):
+        comandos = getattr(self._local, "comandos", None)
+        if comandos is not None and (not comandos or comandos[-1] != sql):
+            comandos.append(sql)
+
+    def _medir(self, nome, metodo):
+        @wraps(metodo)
+        def medido(db, *args, **kwargs):
+            comandos_externos = getattr(self._local, "comandos", None)
+            self._local.comandos = comandos = []
+            inicio = time.perf_counter()
+            try:
+                resultado = metodo(db, *args, **kwargs)
+            finally:
+                duracao_ms = (time.perf_counter() - inicio) * 1000
+                self._local.comandos = comandos_externos
+            if isinstance(resultado, list):
+                linhas = len(resultado)
+            else:
+                linhas = 0 if resultado is None else 1
+            self._registrar(nome, duracao_ms, linhas)
+            if duracao_ms >= self.limite_lento_ms:
+                self._registrar_lenta(db, nome, duracao_ms, comandos)
+            return resultado
+
+        return medido
+
+    # Geradores (exportar_registros) só executam SQL enquanto são consumidos: mede o tempo gasto dentro
+    # de cada next(), sem o tempo de quem consome, e conta os itens entregues como linhas
+    def _medir_gerador(self, nome, metodo):
+        @wraps(metodo)
+        def medido(db, *args, **kwargs):
+            gerador = metodo(db, *args, **kwargs)
+            comandos = []
+            duracao_ms = 0.0
+            linhas = 0
+            try:
+                while True:
+                    comandos_externos = getattr(self._local, "comandos", None)
+                    self._local.comandos = comandos
+                    inicio = time.perf_counter()
+                    try:
+                        item = next(gerador)
+                    except StopIteration:
+                        break
+                    finally:
+                        duracao_ms += (time.perf_counter() - inicio) * 1000
+                        self._local.comandos = comandos_externos
+                    linhas += 1
+                    yield item
+            finally:
+                gerador.close()
+                self._registrar(nome, duracao_ms, linhas)
+                if duracao_ms >= self.limite_lento_ms:
+                    self._registrar_lenta(db, nome, duracao_ms, comandos)
+
+        return medido
+
+    def _registrar(self, nome, duracao_ms, linhas):
+        faixa = bisect.bisect_left(self.LIMITES_HISTOGRAMA_MS, duracao_ms)
+        with self._lock:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                metrica = self._metricas[nome] = {
+                    "chamadas": 0,
+                    "tempo_total_ms": 0.0,
+                    "tempo_maximo_ms": 0.0,
+                    "linhas": 0,
+                    "histograma": [0] * (len(self.LIMITES_HISTOGRAMA_MS) + 1),
+                }
+            metrica["chamadas"] += 1
+            metrica["tempo_total_ms"] += duracao_ms
+            metrica["tempo_maximo_ms"] = max(metrica["tempo_maximo_ms"], duracao_ms)
+            metrica["linhas"] += linhas
+            metrica["histograma"][faixa] += 1
+
+    # O rastreador recebe o SQL com os valores já substituídos (inclusive senhas e hashes): o plano é
+    # calculado sobre esse texto, mas o que fica guardado, no log e na tela, tem os literais trocados por ?
+    def _registrar_lenta(self, db, nome, duracao_ms, comandos):
+        import re
+
+        literais = re.compile(r"[xX]?'(?:[^']|'')*'|(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.])")
+        sem_valores = {}
+        for sql in comandos:
+            sem_valores.setdefault(literais.sub("?", sql), sql)
+        planos = []
+        with db.conexoes.leitura() as conn:
+            for modelo, sql in sem_valores.items():
+                if sql.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                    try:
+                        plano = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                    except sqlite3.Error as erro:
+                        plano = [(0, 0, 0, f"Plano indisponível: {literais.sub('?', str(erro))}")]
+                    planos.append({"sql": modelo, "plano": [linha[3] for linha in plano]})
+        registro = {"metodo": nome, "duracao_ms": round(duracao_ms, 3), "comandos": planos}
+        with self._lock:
+            self._lentas.append(registro)
+        import json
+
+        self.logger.warning("Consulta lenta: %s", json.dumps(registro, ensure_ascii=False))
+
+    def estatisticas(self):
+        with self._lock:
+            metodos = {
+                nome: {
+                    **metrica,
+                    "histograma": list(metrica["histograma"]),
+                    "tempo_medio_ms": metrica["tempo_total_ms"] / metrica["chamadas"],
+                }
+                for nome, metrica in self._metricas.items()
+            }
+            return {
+                "ativa": self.ativa,
+                "limites_histograma_ms": list(self.LIMITES_HISTOGRAMA_MS),
+                "metodos": metodos,
+                "consultas_lentas": list(self._lentas),
+            }
+
+
+instrumentacao = Instrumentacao()
+
+# Fachada assíncrona: executa os métodos do Database em um executor dedicado
+class AsyncDatabase:
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, db):
+        self.db = db
+
+    @classmethod
+    def executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gestao-db")
+            return cls._executor
+
+    # O executor é compartilhado por todas as sessões: login e cadastro esperam o pool de senhas aqui,
+    # no event loop, e só os passos de banco passam pelo executor
+    async def validar_usuario(self, email, senha):
+        if controle_tentativas.bloqueado(email):
+            return None
+        linha = await self.buscar_credenciais(email)
+        armazenada = linha[4] if linha else await verificador_senhas.ficticia_async()
+        if not _login_aceito(email, linha, await verificador_senhas.verificar_async(senha, armazenada)):
+            return None
+        if verificador_senhas.precisa_atualizar(armazenada):
+            await self.regravar_senha(linha[0], armazenada, await verificador_senhas.gerar_async(senha))
+        return Usuario._make(linha[:4])
+
+    async def adicionar_usuario(self, nome, email, senha, tipo):
+        await self.inserir_usuario(nome, email, await verificador_senhas.gerar_async(senha), tipo)
+
+    def __getattr__(self, nome):
+        metodo = getattr(self.db, nome)
+        if not callable(metodo):
+            return metodo
+
+        async def executar(*args, **kwargs):
+            import asyncio
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor(), partial(metodo, *args, **kwargs))
+
+        return executar
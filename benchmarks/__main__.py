@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+from banco_dados import Database
+
+from .cenarios import CENARIOS, comparar, executar
+from .gerador import gerar_dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks da classe Database com dados sintéticos.")
+    parser.add_argument("--tamanho", type=int, default=10000, help="quantidade de demandas geradas (1000 a 1000000)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--fator-repeticoes", type=float, default=1.0, help="multiplica as repetições de cada cenário")
+    parser.add_argument("--cenarios", nargs="*", choices=list(CENARIOS), help="executa apenas os cenários indicados")
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados (padrão: saída padrão)")
+    parser.add_argument("--comparar", help="arquivo JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita na mediana")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db = Database(os.path.join(diretorio, "benchmark.db"))
+        inicio = time.perf_counter()
+        dados = gerar_dados(db, args.tamanho, args.semente)
+        geracao = time.perf_counter() - inicio
+        resultado = {
+            "tamanho": args.tamanho,
+            "semente": args.semente,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "geracao_s": round(geracao, 3),
+            "cenarios": executar(db, dados, args.semente, args.fator_repeticoes, args.cenarios),
+        }
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        for nome, anterior, atual in regressoes:
+            print(f"Regressão em {nome}: mediana {anterior} ms -> {atual} ms", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+import flet as ft
+
+from banco_dados import Database
+
+from .gerador import PALAVRAS, SENHA_PADRAO, STATUS, gerar_dados
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERFIS = ("Administrador", "Demandante", "Bolsista")
+# Chance de a sessão sair e entrar de novo ao fim de cada iteração
+CHANCE_RELOGIN = 0.1
+
+
+def _carregar_interface():
+    spec = importlib.util.spec_from_file_location("tp_final", os.path.join(RAIZ, "TP-FINAL.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _percentil(tempos, fracao):
+    return tempos[max(0, math.ceil(fracao * len(tempos)) - 1)]
+
+
+class Metricas:
+    def __init__(self):
+        self.tempos = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.exemplos = {}
+
+    def registrar(self, acao, segundos):
+        self.tempos[acao].append(segundos * 1000)
+
+    def falha(self, acao, erro):
+        self.erros[acao] += 1
+        self.exemplos.setdefault(acao, f"{type(erro).__name__}: {erro}")
+
+    def resumo(self):
+        acoes = {}
+        for acao, tempos in sorted(self.tempos.items()):
+            tempos = sorted(tempos)
+            acoes[acao] = {
+                "quantidade": len(tempos),
+                "p50_ms": round(_percentil(tempos, 0.5), 3),
+                "p95_ms": round(_percentil(tempos, 0.95), 3),
+                "p99_ms": round(_percentil(tempos, 0.99), 3),
+                "maximo_ms": round(tempos[-1], 3),
+            }
+        erros = {acao: {"quantidade": total, "exemplo": self.exemplos[acao]} for acao, total in sorted(self.erros.items())}
+        return acoes, erros
+
+
+# Faz o papel do PubSub do Flet para todas as sessões do processo. As alterações são publicadas
+# pelas threads do banco, então a entrega volta para o loop com call_soon_threadsafe
+class CanalSimulado:
+    def __init__(self, loop, metricas):
+        self.loop = loop
+        self.metricas = metricas
+        self.inscritos = {}
+        self.pendentes = set()
+
+    def cliente(self, pagina):
+        return SimpleNamespace(
+            subscribe_topic=lambda topico, handler: self.inscritos.setdefault(pagina, []).append((topico, handler)),
+            unsubscribe_all=lambda: self.inscritos.pop(pagina, None),
+            send_all_on_topic=lambda topico, mensagem: self.loop.call_soon_threadsafe(
+                self._entregar, topico, mensagem, time.perf_counter()
+            ),
+        )
+
+    def _entregar(self, topico, mensagem, enviada):
+        for pagina, handlers in list(self.inscritos.items()):
+            for inscrito, handler in handlers:
+                if inscrito == topico:
+                    tarefa = self.loop.create_task(self._executar(pagina, handler, topico, mensagem, enviada))
+                    self.pendentes.add(tarefa)
+                    tarefa.add_done_callback(self.pendentes.discard)
+
+    # Só conta a propagação nas sessões cuja tela foi de fato redesenhada pela alteração
+    async def _executar(self, pagina, handler, topico, mensagem, enviada):
+        atualizacoes = pagina.atualizacoes
+        try:
+            await handler(topico, mensagem)
+        except Exception as erro:
+            self.metricas.falha("propagar_alteracao", erro)
+            return
+        if pagina.atualizacoes != atualizacoes:
+            self.metricas.registrar("propagar_alteracao", time.perf_counter() - enviada)
+
+    def remover(self, pagina):
+        self.inscritos.pop(pagina, None)
+
+
+class SessaoPagina(dict):
+    def set(self, chave, valor):
+        self[chave] = valor
+
+
+# Substitui ft.Page: guarda a árvore de controles em memória e conta os redesenhos
+class PaginaSimulada:
+    def __init__(self, canal):
+        self.controls = []
+        self.session = SessaoPagina()
+        self.pubsub = canal.cliente(self)
+        self.snack_bar = None
+        self.title = None
+        self.scroll = None
+        self.atualizacoes = 0
+
+    def update(self, *controles):
+        self.atualizacoes += 1
+
+    def add(self, *controles):
+        self.controls.extend(controles)
+        self.update()
+
+
+def _percorrer(controle):
+    yield controle
+    filhos = getattr(controle, "controls", None)
+    if isinstance(filhos, list):
+        for filho in filhos:
+            yield from _percorrer(filho)
+    conteudo = getattr(controle, "content", None)
+    if isinstance(conteudo, ft.Control):
+        yield from _percorrer(conteudo)
+
+
+class SessaoCarga:
+    def __init__(self, interface, canal, metricas, perfil, email, aleatorio, pensar):
+        self.interface = interface
+        self.canal = canal
+        self.metricas = metricas
+        self.perfil = perfil
+        self.email = email
+        self.aleatorio = aleatorio
+        self.pensar = pensar
+        self.pagina = None
+
+    def _controles(self, tipo, rotulo=None):
+        return [
+            controle
+            for raiz in self.pagina.controls
+            for controle in _percorrer(raiz)
+            if isinstance(controle, tipo)
+            and (rotulo is None or rotulo in (getattr(controle, "text", None), getattr(controle, "label", None)))
+        ]
+
+    def _controle(self, tipo, rotulo):
+        controles = self._controles(tipo, rotulo)
+        if not controles:
+            raise LookupError(f"{tipo.__name__} '{rotulo}' não está na tela")
+        return controles[0]
+
+    async def _esperar(self):
+        if self.pensar > 0:
+            await asyncio.sleep(self.aleatorio.expovariate(1 / self.pensar))
+
+    async def _acionar(self, acao, handler, **evento):
+        inicio = time.perf_counter()
+        resultado = handler(SimpleNamespace(control=None, data=None, **evento))
+        if asyncio.iscoroutine(resultado):
+            await resultado
+        self.metricas.registrar(acao, time.perf_counter() - inicio)
+
+    async def _clicar(self, acao, rotulo):
+        await self._acionar(acao, self._controle(ft.ElevatedButton, rotulo).on_click)
+
+    async def _buscar(self, acao, texto):
+        campo = self._controle(ft.TextField, "Buscar Demandas")
+        campo.value = texto
+        await self._acionar(acao, campo.on_submit)
+
+    # Digita em um CampoBusca e escolhe uma das sugestões; a pausa de ESPERA não entra na medição
+    async def _sugerir(self, acao, rotulo, texto, acao_escolha=None):
+        campo = self._controle(ft.TextField, rotulo)
+        busca = campo.on_change.__self__
+        campo.value = texto
+        inicio = time.perf_counter()
+        await campo.on_change(None)
+        await busca._tarefa
+        self.metricas.registrar(acao, time.perf_counter() - inicio - busca.ESPERA)
+        if busca.opcoes.controls:
+            await self._esperar()
+            opcao = self.aleatorio.choice(busca.opcoes.controls)
+            if acao_escolha:
+                await self._acionar(acao_escolha, opcao.on_click)
+            else:
+                await opcao.on_click(None)
+        return busca.valor
+
+    async def entrar(self):
+        if self.pagina is not None:
+            self.canal.remover(self.pagina)
+        self.pagina = PaginaSimulada(self.canal)
+        self.interface.main(self.pagina)
+        self._controle(ft.TextField, "Email").value = self.email
+        self._controle(ft.TextField, "Senha").value = SENHA_PADRAO
+        await self._clicar("login", "Login")
+        if self.pagina.session.get("user_type") != self.perfil:
+            raise RuntimeError(f"login de {self.email} não abriu a tela de {self.perfil}")
+
+    async def sair(self):
+        await self._clicar("sair", "Sair")
+
+    async def iteracao(self):
+        if self.perfil == "Administrador":
+            fluxo = self.aleatorio.choices(
+                [self._admin_demandas, self._admin_bolsistas, self._admin_painel], weights=[5, 3, 1]
+            )[0]
+        elif self.perfil == "Demandante":
+            fluxo = self.aleatorio.choice([self._demandante_cadastrar, self._consultar_demandas])
+        else:
+            fluxo = self._consultar_demandas
+        await fluxo()
+
+    async def _admin_demandas(self):
+        await self._clicar("abrir_demandas", "Gerenciar Demandas")
+        await self._esperar()
+        lista = self._controles(ft.ListView)[0]
+        await self._acionar("rolar_demandas", lista.on_scroll, pixels=1000, max_scroll_extent=1000)
+        await self._esperar()
+        selecionar = self._controles(ft.ElevatedButton, "Selecionar")
+        if selecionar:
+            await self._acionar("selecionar_demanda", self.aleatorio.choice(selecionar).on_click)
+            await self._esperar()
+            self._controle(ft.Dropdown, "Novo Status").value = self.aleatorio.choice(STATUS)
+            await self._clicar("atualizar_status", "Atualizar Status")
+            await self._esperar()
+        await self._buscar("buscar_demandas", self.aleatorio.choice(PALAVRAS))
+        await self._esperar()
+        await self._clicar("voltar_menu", "Voltar")
+
+    async def _admin_bolsistas(self):
+        await self._clicar("abrir_bolsistas", "Gerenciar Bolsistas")
+        await self._esperar()
+        await self._sugerir("sugerir_bolsistas", "Selecione o Bolsista", f"Usuário {self.aleatorio.randint(1, 9)}")
+        await self._esperar()
+        await self._sugerir("sugerir_demandas", "Selecione a Demanda", self.aleatorio.choice(PALAVRAS)[:3])
+        await self._esperar()
+        await self._clicar("atribuir_demanda", "Atribuir Demanda")
+        await self._esperar()
+        await self._clicar("voltar_menu", "Voltar")
+
+    async def _admin_painel(self):
+        await self._clicar("abrir_painel", "Painel")
+        await self._esperar()
+        await self._clicar("voltar_menu", "Voltar")
+
+    async def _demandante_cadastrar(self):
+        self._controle(ft.TextField, "Título da Demanda").value = " ".join(self.aleatorio.choices(PALAVRAS, k=4))
+        self._controle(ft.TextField, "Descrição da Demanda").value = " ".join(self.aleatorio.choices(PALAVRAS, k=20))
+        await self._sugerir("sugerir_projetos", "Selecione o Projeto", f"Projeto {self.aleatorio.randint(1, 9)}")
+        await self._esperar()
+        await self._clicar("cadastrar_demanda", "Cadastrar Demanda")
+
+    async def _consultar_demandas(self):
+        await self._buscar("buscar_demandas", self.aleatorio.choice(PALAVRAS))
+        await self._esperar()
+        await self._buscar("listar_demandas", "")
+        await self._esperar()
+        arquivadas = self._controle(ft.Checkbox, "Incluir arquivadas")
+        arquivadas.value = not arquivadas.value
+        await self._acionar("alternar_arquivadas", arquivadas.on_change)
+
+    # Uma falha encerra a iteração e a sessão recomeça do login, como faria o usuário
+    async def executar(self, prazo, iteracoes):
+        await asyncio.sleep(self.aleatorio.uniform(0, self.pensar))
+        conectada = False
+        feitas = 0
+        while (feitas < iteracoes) if iteracoes else (time.perf_counter() < prazo):
+            acao = "login"
+            try:
+                if not conectada:
+                    await self.entrar()
+                    conectada = True
+                    await self._esperar()
+                acao = "iteracao"
+                await self.iteracao()
+                feitas += 1
+                await self._esperar()
+                if self.aleatorio.random() < CHANCE_RELOGIN:
+                    acao = "sair"
+                    await self.sair()
+                    conectada = False
+            except Exception as erro:
+                self.metricas.falha(acao, erro)
+                conectada = False
+                feitas += 1
+        if self.pagina is not None:
+            self.canal.remover(self.pagina)
+
+
+def _distribuir_perfis(sessoes, proporcao):
+    total = sum(proporcao)
+    quantidades = [math.floor(sessoes * peso / total) for peso in proporcao]
+    # Sessões que sobram do arredondamento vão para os perfis de maior peso
+    for indice in sorted(range(len(PERFIS)), key=lambda i: -proporcao[i])[:sessoes - sum(quantidades)]:
+        quantidades[indice] += 1
+    return [perfil for perfil, quantidade in zip(PERFIS, quantidades) for _ in range(quantidade)]
+
+
+async def simular(interface, db, dados, args):
+    loop = asyncio.get_running_loop()
+    metricas = Metricas()
+    canal = CanalSimulado(loop, metricas)
+    usuarios = {"Administrador": [1], "Demandante": dados["demandantes"], "Bolsista": dados["bolsistas"]}
+    sessoes = []
+    for indice, perfil in enumerate(_distribuir_perfis(args.sessoes, args.proporcao)):
+        aleatorio = random.Random(f"{args.semente}-{indice}")
+        email = f"usuario{aleatorio.choice(usuarios[perfil])}@exemplo.com"
+        sessoes.append(SessaoCarga(interface, canal, metricas, perfil, email, aleatorio, args.pensar))
+
+    db.conexoes.zerar_esperas()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(sessao.executar(inicio + args.duracao, args.iteracoes) for sessao in sessoes))
+    while canal.pendentes:
+        await asyncio.gather(*canal.pendentes)
+    duracao = time.perf_counter() - inicio
+
+    acoes, erros = metricas.resumo()
+    return {
+        "sessoes": args.sessoes,
+        "perfis": {perfil: sum(1 for sessao in sessoes if sessao.perfil == perfil) for perfil in PERFIS},
+        "pensar_s": args.pensar,
+        "duracao_s": round(duracao, 3),
+        "acoes_por_segundo": round(sum(item["quantidade"] for item in acoes.values()) / duracao, 3),
+        "acoes": acoes,
+        "erros": erros,
+        "esperas_bd": db.estatisticas_esperas(),
+    }
+
+
+def comparar(atual, base, tolerancia=0.2, folga_ms=1.0):
+    regressoes = []
+    for acao, resultado in atual["acoes"].items():
+        anterior = base["acoes"].get(acao)
+        if anterior and resultado["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia) + folga_ms:
+            regressoes.append((acao, anterior["p95_ms"], resultado["p95_ms"]))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas da interface, sem navegador.")
+    parser.add_argument("--sessoes", type=int, default=20)
+    parser.add_argument("--proporcao", type=float, nargs=3, default=[1, 6, 3], metavar=("ADMIN", "DEMANDANTE", "BOLSISTA"),
+                        help="peso de cada perfil na divisão das sessões")
+    parser.add_argument("--duracao", type=float, default=60.0, help="segundos de carga")
+    parser.add_argument("--iteracoes", type=int, help="iterações por sessão; substitui --duracao para carga reproduzível")
+    parser.add_argument("--pensar", type=float, default=1.0, help="tempo médio de reflexão entre ações, em segundos")
+    parser.add_argument("--tamanho", type=int, default=10000, help="quantidade de demandas geradas")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados (padrão: saída padrão)")
+    parser.add_argument("--comparar", help="arquivo JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita no p95")
+    parser.add_argument("--folga-ms", type=float, default=1.0, help="piora absoluta aceita no p95, contra ruído")
+    args = parser.parse_args()
+
+    interface = _carregar_interface()
+    diretorio_atual = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        # A interface abre o banco padrão (gestao.db) no diretório atual
+        os.chdir(diretorio)
+        try:
+            db = Database()
+            dados = gerar_dados(db, args.tamanho, args.semente)
+            resultado = asyncio.run(simular(interface, db, dados, args))
+        finally:
+            os.chdir(diretorio_atual)
+    resultado = {
+        "tamanho": args.tamanho,
+        "semente": args.semente,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        **resultado,
+    }
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    falhou = False
+    for acao, erro in resultado["erros"].items():
+        print(f"Erros em {acao}: {erro['quantidade']} ({erro['exemplo']})", file=sys.stderr)
+        falhou = True
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia, args.folga_ms)
+        for acao, anterior, atual in regressoes:
+            print(f"Regressão em {acao}: p95 {anterior} ms -> {atual} ms", file=sys.stderr)
+        falhou = falhou or bool(regressoes)
+    if falhou:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
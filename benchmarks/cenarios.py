@@ -0,0 +1,92 @@
+import random
+import statistics
+import time
+
+from .gerador import SENHA_PADRAO, STATUS
+
+
+def _validar_usuario(db, dados, aleatorio):
+    usuario_id = aleatorio.randint(1, dados["usuarios"])
+    db.validar_usuario(f"usuario{usuario_id}@exemplo.com", SENHA_PADRAO)
+
+
+def _listar_demandas_demandante(db, dados, aleatorio):
+    db.listar_demandas(usuario_id=aleatorio.choice(dados["demandantes"]), tipo_usuario="Demandante")
+
+
+def _listar_demandas_bolsista(db, dados, aleatorio):
+    db.listar_demandas(usuario_id=aleatorio.choice(dados["bolsistas"]), tipo_usuario="Bolsista")
+
+
+def _listar_demandas_administrador(db, dados, aleatorio):
+    db.listar_demandas(usuario_id=1, tipo_usuario="Administrador")
+
+
+def _listar_projetos(db, dados, aleatorio):
+    # Consulta direto no banco, sem passar pelo cache de leitura
+    db._listar_projetos(None, None)
+
+
+def _cadastrar_demanda(db, dados, aleatorio):
+    db.cadastrar_demanda(
+        "Demanda de benchmark",
+        "Gerada pelo benchmark",
+        aleatorio.choice(dados["demandantes"]),
+        aleatorio.randint(1, dados["projetos"])
+    )
+
+
+def _atualizar_status_demanda(db, dados, aleatorio):
+    db.atualizar_status_demanda(
+        aleatorio.randint(1, dados["demandas"]),
+        aleatorio.choice(STATUS),
+        aleatorio.choice(dados["bolsistas"])
+    )
+
+
+# nome -> (função, repetições padrão)
+CENARIOS = {
+    "validar_usuario": (_validar_usuario, 50),
+    "listar_demandas_demandante": (_listar_demandas_demandante, 200),
+    "listar_demandas_bolsista": (_listar_demandas_bolsista, 200),
+    "listar_demandas_administrador": (_listar_demandas_administrador, 5),
+    "listar_projetos": (_listar_projetos, 100),
+    "cadastrar_demanda": (_cadastrar_demanda, 200),
+    "atualizar_status_demanda": (_atualizar_status_demanda, 200),
+}
+
+
+def medir(funcao, repeticoes, db, dados, aleatorio):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(db, dados, aleatorio)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "repeticoes": repeticoes,
+        "minimo_ms": round(tempos[0], 4),
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "p95_ms": round(tempos[int(0.95 * (len(tempos) - 1))], 4),
+        "media_ms": round(statistics.fmean(tempos), 4),
+    }
+
+
+def executar(db, dados, semente=42, fator_repeticoes=1.0, nomes=None):
+    resultados = {}
+    for nome, (funcao, repeticoes) in CENARIOS.items():
+        if nomes and nome not in nomes:
+            continue
+        aleatorio = random.Random(f"{semente}-{nome}")
+        resultados[nome] = medir(funcao, max(1, int(repeticoes * fator_repeticoes)), db, dados, aleatorio)
+    return resultados
+
+
+# Retorna os cenários cuja mediana piorou além da tolerância em relação à execução base
+def comparar(atual, base, tolerancia=0.2):
+    regressoes = []
+    for nome, resultado in atual["cenarios"].items():
+        anterior = base["cenarios"].get(nome)
+        if anterior and resultado["mediana_ms"] > anterior["mediana_ms"] * (1 + tolerancia):
+            regressoes.append((nome, anterior["mediana_ms"], resultado["mediana_ms"]))
+    return regressoes
@@ -0,0 +1,76 @@
+import random
+
+from banco_dados import verificador_senhas
+
+STATUS = ["Pendente", "Em Andamento", "Concluída", "Entregue", "Recusada"]
+PALAVRAS = [
+    "relatório", "site", "banco", "dados", "pesquisa", "ensino", "extensão", "laboratório",
+    "planilha", "cadastro", "análise", "sistema", "evento", "artigo", "revisão", "manutenção"
+]
+TAMANHO_LOTE = 10000
+SENHA_PADRAO = "senha"
+
+
+def dimensoes(tamanho):
+    return {
+        "demandas": tamanho,
+        "usuarios": max(30, tamanho // 10),
+        "projetos": max(5, tamanho // 100),
+    }
+
+
+def _lotes(linhas):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == TAMANHO_LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _inserir(db, sql, linhas):
+    for lote in _lotes(linhas):
+        with db.conexoes.escrita() as conn:
+            conn.executemany(sql, lote)
+
+
+# Popula o banco com dados sintéticos; a mesma semente sempre gera os mesmos dados
+def gerar_dados(db, tamanho, semente=42):
+    aleatorio = random.Random(semente)
+    total = dimensoes(tamanho)
+    tipos = ["Administrador"] + [("Demandante", "Bolsista")[i % 2] for i in range(total["usuarios"] - 1)]
+    demandantes = [i + 1 for i, tipo in enumerate(tipos) if tipo == "Demandante"]
+    bolsistas = [i + 1 for i, tipo in enumerate(tipos) if tipo == "Bolsista"]
+
+    def frase(quantidade):
+        return " ".join(aleatorio.choices(PALAVRAS, k=quantidade))
+
+    # Todos os usuários compartilham a mesma senha: um hash scrypt por usuário tornaria a geração lenta
+    senha = verificador_senhas.gerar(SENHA_PADRAO)
+    _inserir(
+        db,
+        "INSERT INTO usuarios (id, nome, email, senha, tipo) VALUES (?, ?, ?, ?, ?)",
+        ((i + 1, f"Usuário {i + 1}", f"usuario{i + 1}@exemplo.com", senha, tipo)
+         for i, tipo in enumerate(tipos))
+    )
+    _inserir(
+        db,
+        "INSERT INTO projetos (id, nome, area) VALUES (?, ?, ?)",
+        ((i + 1, f"Projeto {i + 1}", frase(1)) for i in range(total["projetos"]))
+    )
+    _inserir(
+        db,
+        "INSERT OR IGNORE INTO projeto_usuarios (projeto_id, usuario_id) VALUES (?, ?)",
+        ((aleatorio.randint(1, total["projetos"]), bolsista) for bolsista in bolsistas for _ in range(2))
+    )
+    _inserir(
+        db,
+        "INSERT INTO demandas (titulo, descricao, solicitante_id, projeto_id, status, bolsista_id) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((frase(4), frase(20), aleatorio.choice(demandantes), aleatorio.randint(1, total["projetos"]),
+          status, None if status == "Pendente" else aleatorio.choice(bolsistas))
+         for status in (aleatorio.choice(STATUS) for _ in range(total["demandas"])))
+    )
+    return {**total, "demandantes": demandantes, "bolsistas": bolsistas}
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada medição roda em um processo novo para incluir o custo real de importação
+MEDICOES = {
+    "importar_banco_dados": """
+inicio = time.perf_counter()
+import banco_dados
+resultado = time.perf_counter() - inicio
+""",
+    "importar_interface": """
+import importlib.util
+inicio = time.perf_counter()
+spec = importlib.util.spec_from_file_location("tp_final", "TP-FINAL.py")
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+resultado = time.perf_counter() - inicio
+""",
+    "primeira_sessao_banco_novo": """
+from banco_dados import Database
+os.remove(CAMINHO) if os.path.exists(CAMINHO) else None
+inicio = time.perf_counter()
+Database(CAMINHO)
+resultado = time.perf_counter() - inicio
+""",
+    "primeira_sessao_banco_existente": """
+from banco_dados import Database
+inicio = time.perf_counter()
+Database(CAMINHO)
+resultado = time.perf_counter() - inicio
+""",
+    "sessoes_seguintes": """
+from banco_dados import Database
+Database(CAMINHO)
+inicio = time.perf_counter()
+for _ in range(100):
+    Database(CAMINHO)
+resultado = (time.perf_counter() - inicio) / 100
+""",
+    # Custo que toda sessão pagava antes: transação de escrita só para conferir a versão do esquema
+    "verificacao_com_escrita": """
+from banco_dados import Database
+db = Database(CAMINHO)
+inicio = time.perf_counter()
+for _ in range(100):
+    with db.conexoes.escrita() as conn:
+        conn.execute("PRAGMA user_version").fetchone()
+resultado = (time.perf_counter() - inicio) / 100
+""",
+}
+
+
+def _medir(codigo, caminho):
+    script = f"import os, time\nCAMINHO = {caminho!r}\n{codigo}\nprint(resultado)\n"
+    saida = subprocess.run(
+        [sys.executable, "-c", script], cwd=RAIZ, capture_output=True, text=True, check=True
+    ).stdout
+    return float(saida.strip().splitlines()[-1]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização da aplicação.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--medicoes", nargs="*", choices=list(MEDICOES))
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "inicializacao.db")
+        for nome, codigo in MEDICOES.items():
+            if args.medicoes and nome not in args.medicoes:
+                continue
+            try:
+                tempos = sorted(_medir(codigo, caminho) for _ in range(args.repeticoes))
+            except subprocess.CalledProcessError as erro:
+                resultados[nome] = {"erro": erro.stderr.strip().splitlines()[-1]}
+                continue
+            resultados[nome] = {
+                "minimo_ms": round(tempos[0], 3),
+                "mediana_ms": round(statistics.median(tempos), 3),
+            }
+    print(json.dumps({"repeticoes": args.repeticoes, "medicoes": resultados}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import sqlite3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from transferencia import ler_registros
+
+# Operações expostas pela API: nome público -> método do Database
+OPERACOES = {
+    "login": "validar_usuario",
+    "cadastrar_usuario": "adicionar_usuario",
+    "listar_usuarios": "listar_usuarios",
+    "listar_demandas": "listar_demandas",
+    "listar_demandas_pagina": "listar_demandas_pagina",
+    "buscar_demandas": "buscar_demandas",
+    "obter_demanda": "obter_demanda",
+    "cadastrar_demanda": "cadastrar_demanda",
+    "atribuir_demanda": "atribuir_demanda",
+    "distribuir_demandas": "distribuir_demandas",
+    "atualizar_status_demanda": "atualizar_status_demanda",
+    "resumo_demandas": "resumo_demandas",
+    "percentis_tempo_entrega": "percentis_tempo_entrega",
+    "vazao_por_periodo": "vazao_por_periodo",
+    "tempo_em_status": "tempo_em_status",
+    "listar_projetos": "listar_projetos",
+    "sugerir_bolsistas": "sugerir_bolsistas",
+    "sugerir_projetos": "sugerir_projetos",
+    "sugerir_demandas": "sugerir_demandas",
+    "adicionar_projeto": "adicionar_projeto",
+    "adicionar_participante_projeto": "adicionar_participante_projeto",
+    "remover_participante_projeto": "remover_participante_projeto",
+}
+TABELAS_EXPORTACAO = ("usuarios", "projetos", "demandas")
+TAMANHO_PAGINA_STREAM = 500
+
+
+class ErroServico(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def para_json(valor):
+    if hasattr(valor, "_asdict"):
+        return valor._asdict()
+    if isinstance(valor, (list, tuple)):
+        return [para_json(item) for item in valor]
+    if isinstance(valor, dict):
+        return {chave: para_json(item) for chave, item in valor.items()}
+    return valor
+
+
+# Camada de serviço: valida o nome da operação e delega ao Database
+class ServicoGestao:
+    def __init__(self, db):
+        self.db = db
+
+    def executar(self, operacao, argumentos=None):
+        if operacao not in OPERACOES:
+            raise ErroServico(404, f"Operação desconhecida: {operacao}")
+        if not isinstance(argumentos or {}, dict):
+            raise ErroServico(400, "Os argumentos devem ser um objeto JSON")
+        metodo = getattr(self.db, OPERACOES[operacao])
+        try:
+            return para_json(metodo(**(argumentos or {})))
+        except (TypeError, ValueError) as erro:
+            raise ErroServico(400, f"Argumentos inválidos para {operacao}: {erro}")
+        except sqlite3.IntegrityError as erro:
+            raise ErroServico(409, str(erro))
+
+    def executar_lote(self, comandos):
+        resultados = []
+        for comando in comandos:
+            if not isinstance(comando, dict):
+                resultados.append({"erro": "Cada comando deve ser um objeto JSON", "status": 400})
+                continue
+            try:
+                resultado = self.executar(comando.get("operacao"), comando.get("argumentos"))
+                resultados.append({"resultado": resultado})
+            except ErroServico as erro:
+                resultados.append({"erro": str(erro), "status": erro.status})
+            except sqlite3.Error as erro:
+                resultados.append({"erro": f"Erro no banco de dados: {erro}", "status": 500})
+        return resultados
+
+    def importar(self, tabela, registros):
+        try:
+            resultado = self.db.importar_registros(tabela, registros)
+        except ValueError as erro:
+            raise ErroServico(404, str(erro))
+        return {"inseridos": resultado["inseridos"], "erros": [list(erro) for erro in resultado["erros"]]}
+
+    # Valida os filtros antes de devolver o gerador, para que o erro saia antes do cabeçalho 200
+    def iterar_demandas(self, tipo_usuario, usuario_id=None, status=None, projeto_id=None):
+        filtros = {"status": status, "projeto_id": projeto_id}
+        if tipo_usuario in ("Demandante", "Bolsista") and usuario_id is None:
+            raise ErroServico(400, f"Informe usuario_id para listar demandas de {tipo_usuario}")
+        if tipo_usuario == "Demandante":
+            filtros["solicitante_id"] = usuario_id
+        elif tipo_usuario == "Bolsista":
+            filtros["bolsista_id"] = usuario_id
+        elif tipo_usuario != "Administrador":
+            return iter(())
+        return self._paginar_demandas(filtros)
+
+    def _paginar_demandas(self, filtros):
+        apos_id = 0
+        while True:
+            pagina = self.db.listar_demandas_pagina(apos_id=apos_id, limite=TAMANHO_PAGINA_STREAM, **filtros)
+            for demanda in pagina:
+                yield para_json(demanda)
+            if len(pagina) < TAMANHO_PAGINA_STREAM:
+                return
+            apos_id = pagina[-1].id
+
+
+class ManipuladorServico(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    servico = None
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        if not tamanho:
+            return {}
+        try:
+            return json.loads(self.rfile.read(tamanho))
+        except ValueError:
+            raise ErroServico(400, "Corpo da requisição não é JSON válido")
+
+    # Lê o corpo linha a linha, sem carregá-lo inteiro na memória
+    def _ler_linhas(self):
+        restante = int(self.headers.get("Content-Length") or 0)
+        while restante > 0:
+            linha = self.rfile.readline(restante)
+            if not linha:
+                return
+            restante -= len(linha)
+            yield linha
+
+    def do_POST(self):
+        try:
+            caminho = urlparse(self.path).path
+            if caminho.startswith("/api/importar/"):
+                registros = ler_registros(self._ler_linhas(), "jsonl")
+                resultado = self.servico.importar(caminho[len("/api/importar/"):], registros)
+                self._responder(200, {"resultado": resultado})
+            elif caminho == "/api/lote":
+                corpo = self._ler_json()
+                comandos = corpo.get("comandos") if isinstance(corpo, dict) else None
+                if not isinstance(comandos, list):
+                    raise ErroServico(400, "Informe a lista 'comandos'")
+                self._responder(200, {"resultados": self.servico.executar_lote(comandos)})
+            elif caminho.startswith("/api/"):
+                resultado = self.servico.executar(caminho[len("/api/"):], self._ler_json())
+                self._responder(200, {"resultado": resultado})
+            else:
+                raise ErroServico(404, "Rota não encontrada")
+        except ErroServico as erro:
+            self._responder(erro.status, {"erro": str(erro)})
+        # Qualquer outra falha ainda devolve uma resposta, em vez de derrubar a conexão
+        except sqlite3.Error as erro:
+            self._responder(500, {"erro": f"Erro no banco de dados: {erro}"})
+        except Exception as erro:
+            self._responder(500, {"erro": f"Erro interno: {type(erro).__name__}"})
+
+    # GET /api/demandas e /api/exportar/<tabela> devolvem uma linha JSON por registro (NDJSON)
+    # em blocos, sem montar a lista inteira
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/demandas":
+            parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+            try:
+                registros = self.servico.iterar_demandas(
+                    parametros.get("tipo_usuario"),
+                    usuario_id=parametros.get("usuario_id"),
+                    status=parametros.get("status"),
+                    projeto_id=parametros.get("projeto_id")
+                )
+            except ErroServico as erro:
+                self._responder(erro.status, {"erro": str(erro)})
+                return
+        elif url.path.startswith("/api/exportar/"):
+            tabela = url.path[len("/api/exportar/"):]
+            if tabela not in TABELAS_EXPORTACAO:
+                self._responder(404, {"erro": f"Tabela não suportada: {tabela}"})
+                return
+            registros = self.servico.db.exportar_registros(tabela)
+        else:
+            self._responder(404, {"erro": "Rota não encontrada"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        bloco = []
+        for registro in registros:
+            bloco.append(json.dumps(registro, ensure_ascii=False))
+            if len(bloco) == TAMANHO_PAGINA_STREAM:
+                self._enviar_bloco(bloco)
+                bloco = []
+        if bloco:
+            self._enviar_bloco(bloco)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _enviar_bloco(self, linhas):
+        dados = ("\n".join(linhas) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(dados):X}\r\n".encode("ascii") + dados + b"\r\n")
+
+
+def iniciar_servidor(db, host="127.0.0.1", porta=8080):
+    manipulador = type("Manipulador", (ManipuladorServico,), {"servico": ServicoGestao(db)})
+    return ThreadingHTTPServer((host, porta), manipulador)
+
+
+def servir(db, host="127.0.0.1", porta=8080):
+    servidor = iniciar_servidor(db, host, porta)
+    print(f"API disponível em http://{host}:{servidor.server_address[1]}/api/")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+# Executa só a API, sem carregar a interface Flet
+def iniciar():
+    from banco_dados import Database, instrumentacao
+
+    parser = argparse.ArgumentParser(description="API HTTP/JSON da Gestão de Demandas e Projetos")
+    parser.add_argument("--banco", default="gestao.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    args = parser.parse_args()
+    if os.environ.get("GESTAO_INSTRUMENTACAO"):
+        instrumentacao.ativar()
+    servir(Database(args.banco), args.host, args.porta)
+
+
+if __name__ == "__main__":
+    iniciar()
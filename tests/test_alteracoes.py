@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from banco_dados import Database
+
+
+class TestAlteracoes(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.diretorio.name, "alteracoes.db"))
+        self.db.adicionar_usuario("Ana", "ana@exemplo.com", "senha", "Demandante")
+        self.db.adicionar_usuario("Bruno", "bruno@exemplo.com", "senha", "Bolsista")
+        self.db.adicionar_usuario("Carla", "carla@exemplo.com", "senha", "Bolsista")
+        self.demandas = [self.db.cadastrar_demanda(f"Demanda {i}", "", 1, None) for i in range(3)]
+        self.db.atribuir_demanda(2, self.demandas[0])
+        self.alteracao_id = self.db.ultima_alteracao()
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def alteradas(self, *args):
+        ultima, demandas = self.db.listar_demandas_alteradas(self.alteracao_id, *args)
+        return [(demanda.id, demanda.bolsista_id) for demanda in demandas]
+
+    def test_somente_demandas_do_usuario(self):
+        self.db.atribuir_demanda(3, self.demandas[1])
+        self.db.atribuir_demanda(2, self.demandas[2])
+        self.assertEqual(self.alteradas(2, "Bolsista", [self.demandas[0]]), [(self.demandas[2], 2)])
+        self.assertEqual(self.alteradas(3, "Bolsista", []), [(self.demandas[1], 3)])
+        self.assertEqual(len(self.alteradas()), 2)
+
+    # A demanda exibida que passou para outro bolsista volta com o novo dono, para a sessão removê-la
+    def test_exibida_que_deixou_de_ser_do_usuario(self):
+        self.db.atribuir_demanda(3, self.demandas[0])
+        self.assertEqual(self.alteradas(2, "Bolsista", [self.demandas[0]]), [(self.demandas[0], 3)])
+        self.assertEqual(self.alteradas(2, "Bolsista", []), [])
+
+    def test_retencao(self):
+        self.db.atribuir_demanda(3, self.demandas[1])
+        with self.db.conexoes.escrita() as conn:
+            conn.execute("UPDATE alteracoes SET criado_em = datetime('now', '-2 days')")
+        ultima = self.db.ultima_alteracao()
+        self.assertEqual(self.db.limpar_alteracoes(24), ultima - 1)
+        self.assertEqual(self.db.ultima_alteracao(), ultima)
+        self.assertEqual(self.db.limpar_alteracoes(24), 0)
+        # Sessões que ficaram para trás da retenção recarregam a lista inteira
+        self.assertIsNone(self.db.listar_demandas_alteradas(ultima - 2, 2, "Bolsista", [])[1])
+        self.assertEqual(self.db.listar_demandas_alteradas(ultima - 1, 3, "Bolsista", [])[1][0].id, self.demandas[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from banco_dados import Database, GerenciadorConexoes, Instrumentacao
+
+
+# Banco novo: as migrações rodam com leitores já abertos, e o arquivo só é anexado depois delas
+class TestConexoes(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "conexoes.db")
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def test_leitor_aberto_durante_a_migracao(self):
+        # Leitor segurado por outra thread enquanto Database() migra o banco
+        conexoes = GerenciadorConexoes.obter(self.caminho)
+        segurando, liberar = threading.Event(), threading.Event()
+
+        def segurar():
+            with conexoes.leitura() as conn:
+                conn.execute("SELECT name FROM sqlite_master").fetchall()
+                segurando.set()
+                liberar.wait(5)
+
+        thread = threading.Thread(target=segurar)
+        thread.start()
+        segurando.wait(5)
+        db = Database(self.caminho)
+        liberar.set()
+        thread.join()
+
+        db.adicionar_usuario("Ana", "ana@exemplo.com", "senha", "Demandante")
+        demanda_id = db.cadastrar_demanda("Relatório", "", 1, None)
+        for _ in range(conexoes.max_leitores):
+            self.assertEqual([demanda.id for demanda in db.listar_demandas(1, "Demandante")], [demanda_id])
+        self.assertEqual(db.listar_demandas(1, "Demandante", incluir_arquivadas=True)[0].id, demanda_id)
+
+    def test_instrumentacao_depois_da_migracao(self):
+        Database(self.caminho)
+        instrumentacao = Instrumentacao(arquivo_log=None)
+        instrumentacao.ativar()
+        instrumentacao.desativar()
+
+
+if __name__ == "__main__":
+    unittest.main()
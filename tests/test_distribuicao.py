@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from banco_dados import Database
+
+
+# A distribuição grava alteracoes e resumo_bolsista_status por conjunto, com os triggers por linha desligados;
+# os dois precisam terminar iguais ao que os triggers gravariam
+class TestDistribuicao(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.diretorio.name, "distribuicao.db"))
+        self.db.adicionar_usuario("Ana", "ana@exemplo.com", "senha", "Demandante")
+        self.db.adicionar_usuario("Bruno", "bruno@exemplo.com", "senha", "Bolsista")
+        self.db.adicionar_usuario("Carla", "carla@exemplo.com", "senha", "Bolsista")
+        projeto_id = self.db.adicionar_projeto("Pesquisa", "Ensino")
+        self.demandas = [self.db.cadastrar_demanda(f"Demanda {i}", "", 1, projeto_id) for i in range(7)]
+        self.db.atribuir_demanda(2, self.demandas[0])
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def resumo(self):
+        with self.db.conexoes.leitura() as conn:
+            resumo = conn.execute(
+                "SELECT bolsista_id, status, total FROM resumo_bolsista_status WHERE total > 0 ORDER BY 1, 2"
+            ).fetchall()
+            contagem = conn.execute(
+                "SELECT bolsista_id, status, COUNT(*) FROM demandas WHERE bolsista_id IS NOT NULL "
+                "GROUP BY 1, 2 ORDER BY 1, 2"
+            ).fetchall()
+        self.assertEqual(resumo, contagem)
+        return {bolsista_id: total for bolsista_id, _, total in resumo}
+
+    def test_distribuir_demandas(self):
+        alteracao_id = self.db.ultima_alteracao()
+        self.assertEqual(self.db.distribuir_demandas(), {"atribuidas": 6, "sem_candidato": 0})
+        self.assertEqual(self.resumo(), {2: 4, 3: 3})
+        ultima, alteradas = self.db.listar_demandas_alteradas(alteracao_id)
+        self.assertEqual([demanda.id for demanda in alteradas], self.demandas[1:])
+
+        # Fora da distribuição os triggers voltam a valer
+        self.db.atribuir_demanda(2, self.demandas[1])
+        self.assertEqual(self.resumo(), {2: 5, 3: 2})
+        self.assertEqual([demanda.id for demanda in self.db.listar_demandas_alteradas(ultima)[1]], self.demandas[1:2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+import unittest
+
+from banco_dados import Database, Instrumentacao
+
+
+# Com limite 0 toda chamada é gravada como lenta; senhas e hashes não podem aparecer no log nem na tela
+class TestInstrumentacao(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.diretorio.name, "instrumentacao.db"))
+        with self.db.conexoes.escrita() as conn:
+            conn.execute(
+                "INSERT INTO usuarios (nome, email, senha, tipo) "
+                "VALUES ('Ana', 'ana@exemplo.com', 'MinhaSenhaSecreta', 'Demandante')"
+            )
+        self.log = os.path.join(self.diretorio.name, "lentas.log")
+        self.instrumentacao = Instrumentacao(limite_lento_ms=0, arquivo_log=self.log)
+        self.instrumentacao.ativar()
+
+    def tearDown(self):
+        self.instrumentacao.desativar()
+        for handler in self.instrumentacao.logger.handlers[:]:
+            self.instrumentacao.logger.removeHandler(handler)
+            handler.close()
+        self.diretorio.cleanup()
+
+    def test_consultas_lentas_sem_valores(self):
+        self.assertIsNotNone(self.db.validar_usuario("ana@exemplo.com", "MinhaSenhaSecreta"))
+        self.db.adicionar_usuario("Bruno", "bruno@exemplo.com", "OutraSenha", "Bolsista")
+
+        lentas = self.instrumentacao.estatisticas()["consultas_lentas"]
+        comandos = [comando["sql"] for registro in lentas for comando in registro["comandos"]]
+        self.assertIn("UPDATE usuarios SET senha = ? WHERE id = ? AND senha = ?", comandos)
+        with open(self.log, encoding="utf-8") as arquivo:
+            texto = arquivo.read() + json.dumps(lentas)
+        for valor in ("MinhaSenhaSecreta", "OutraSenha", "scrypt$", "ana@exemplo.com"):
+            self.assertNotIn(valor, texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
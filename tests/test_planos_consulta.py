@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from banco_dados import Database
+
+
+# Confere com EXPLAIN QUERY PLAN que as listagens usam índices. Ficam de fora as listagens completas
+# (demandas do administrador e projetos de quem não é administrador), que leem a tabela inteira de propósito
+class TestPlanosConsulta(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.diretorio.name, "planos.db"))
+        self.db.adicionar_usuario("Ana", "ana@exemplo.com", "senha", "Demandante")
+        self.db.adicionar_usuario("Bruno", "bruno@exemplo.com", "senha", "Bolsista")
+        self.db.adicionar_usuario("Carla", "carla@exemplo.com", "senha", "Administrador")
+        projeto_id = self.db.adicionar_projeto("Pesquisa", "Ensino")
+        self.db.adicionar_participante_projeto(projeto_id, 3)
+        demanda_id = self.db.cadastrar_demanda("Relatório", "Relatório anual", 1, projeto_id)
+        self.db.atribuir_demanda(2, demanda_id)
+
+        # Consultas seguidas na mesma thread reaproveitam o mesmo leitor do pool
+        self.comandos = []
+        with self.db.conexoes.leitura() as conn:
+            self.conn = conn
+            conn.set_trace_callback(self.comandos.append)
+
+    def tearDown(self):
+        self.conn.set_trace_callback(None)
+        self.diretorio.cleanup()
+
+    def assertSemScan(self, listar):
+        self.comandos.clear()
+        listar()
+        self.assertTrue(self.comandos, "nenhuma consulta foi executada")
+        for sql in self.comandos:
+            plano = [linha[3] for linha in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            self.assertFalse([passo for passo in plano if passo.startswith("SCAN")], f"{sql}\n{plano}")
+
+    def test_listar_demandas_demandante(self):
+        self.assertSemScan(lambda: self.db.listar_demandas(1, "Demandante"))
+        self.assertSemScan(lambda: self.db.listar_demandas(1, "Demandante", incluir_arquivadas=True))
+
+    def test_listar_demandas_bolsista(self):
+        self.assertSemScan(lambda: self.db.listar_demandas(2, "Bolsista"))
+        self.assertSemScan(lambda: self.db.listar_demandas(2, "Bolsista", incluir_arquivadas=True))
+
+    def test_listar_usuarios(self):
+        self.assertSemScan(lambda: self.db.listar_usuarios("Bolsista"))
+
+    def test_listar_projetos_administrador(self):
+        self.assertSemScan(lambda: self.db.listar_projetos(3, "Administrador"))
+
+
+if __name__ == "__main__":
+    unittest.main()
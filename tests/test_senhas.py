@@ -0,0 +1,77 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from banco_dados import AsyncDatabase, Database, controle_tentativas, verificador_senhas
+
+
+class TestSenhas(unittest.TestCase):
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.diretorio.name, "senhas.db"))
+        self.emails = []
+
+    def tearDown(self):
+        for email in self.emails:
+            controle_tentativas.limpar(email)
+        self.diretorio.cleanup()
+
+    # Grava a senha como está, como num banco anterior ao hash
+    def inserir(self, email, senha):
+        self.emails.append(email)
+        with self.db.conexoes.escrita() as conn:
+            conn.execute(
+                "INSERT INTO usuarios (nome, email, senha, tipo) VALUES ('Ana', ?, ?, 'Demandante')", (email, senha)
+            )
+
+    def senha_gravada(self, email):
+        return self.db.buscar_credenciais(email)[4]
+
+    def test_senha_em_texto_puro_migrada_no_login(self):
+        self.inserir("ana@exemplo.com", "antiga")
+        self.assertIsNone(self.db.validar_usuario("ana@exemplo.com", "errada"))
+        self.assertEqual(self.senha_gravada("ana@exemplo.com"), "antiga")
+
+        self.assertEqual(self.db.validar_usuario("ana@exemplo.com", "antiga").email, "ana@exemplo.com")
+        gravada = self.senha_gravada("ana@exemplo.com")
+        self.assertTrue(verificador_senhas.eh_hash(gravada))
+        self.assertFalse(verificador_senhas.precisa_atualizar(gravada))
+        self.assertIsNotNone(self.db.validar_usuario("ana@exemplo.com", "antiga"))
+        self.assertIsNone(self.db.validar_usuario("ana@exemplo.com", "errada"))
+
+    def test_senha_em_texto_puro_migrada_no_login_assincrono(self):
+        self.inserir("bia@exemplo.com", "antiga")
+        async_db = AsyncDatabase(self.db)
+        self.assertIsNotNone(asyncio.run(async_db.validar_usuario("bia@exemplo.com", "antiga")))
+        self.assertTrue(verificador_senhas.eh_hash(self.senha_gravada("bia@exemplo.com")))
+
+        self.emails.append("caio@exemplo.com")
+        asyncio.run(async_db.adicionar_usuario("Caio", "caio@exemplo.com", "nova", "Bolsista"))
+        self.assertTrue(verificador_senhas.eh_hash(self.senha_gravada("caio@exemplo.com")))
+        self.assertIsNotNone(asyncio.run(async_db.validar_usuario("caio@exemplo.com", "nova")))
+
+    # Hash com formato inválido recusa o login sem erro e sem ser tratado como texto puro
+    def test_hash_malformado(self):
+        for numero, malformado in enumerate(("scrypt$abc", "scrypt$3$8$1$c2Fs$aGFzaA==", "scrypt$16384$8$1$!!$aGFzaA==")):
+            email = f"malformado{numero}@exemplo.com"
+            self.inserir(email, malformado)
+            self.assertFalse(verificador_senhas.eh_hash(malformado))
+            self.assertIsNone(self.db.validar_usuario(email, malformado))
+            self.assertEqual(self.senha_gravada(email), malformado)
+
+    def test_bloqueio_apos_max_falhas(self):
+        self.inserir("dani@exemplo.com", verificador_senhas.gerar("certa"))
+        for _ in range(controle_tentativas.max_falhas):
+            self.assertIsNone(self.db.validar_usuario("dani@exemplo.com", "errada"))
+        self.assertTrue(controle_tentativas.bloqueado("dani@exemplo.com"))
+        # Bloqueado, nem a senha certa é aceita, e o e-mail é comparado sem diferenciar maiúsculas
+        self.assertIsNone(self.db.validar_usuario("dani@exemplo.com", "certa"))
+        self.assertTrue(controle_tentativas.bloqueado("DANI@exemplo.com"))
+
+        controle_tentativas.limpar("dani@exemplo.com")
+        self.assertIsNotNone(self.db.validar_usuario("dani@exemplo.com", "certa"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+FORMATOS = ("csv", "jsonl")
+
+
+def _formato(caminho, formato=None):
+    formato = formato or os.path.splitext(caminho)[1].lstrip(".").lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: {formato or caminho} (use {', '.join(FORMATOS)})")
+    return formato
+
+
+# Lê um registro por vez; linhas JSONL inválidas viram None e são apontadas como erro na importação
+def ler_registros(linhas, formato):
+    if formato == "csv":
+        yield from csv.DictReader(linhas)
+        return
+    for linha in linhas:
+        if not linha.strip():
+            continue
+        try:
+            yield json.loads(linha)
+        except ValueError:
+            yield None
+
+
+def escrever_registros(arquivo, registros, formato, colunas):
+    total = 0
+    if formato == "csv":
+        escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+        escritor.writeheader()
+        for registro in registros:
+            escritor.writerow(registro)
+            total += 1
+    else:
+        for registro in registros:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def importar_arquivo(db, tabela, caminho, formato=None, tamanho_lote=5000):
+    formato = _formato(caminho, formato)
+    # utf-8-sig aceita arquivos CSV salvos com BOM por planilhas
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        return db.importar_registros(tabela, ler_registros(arquivo, formato), tamanho_lote)
+
+
+def exportar_arquivo(db, tabela, caminho, formato=None):
+    from banco_dados import COLUNAS_EXPORTACAO
+
+    formato = _formato(caminho, formato)
+    with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+        return escrever_registros(arquivo, db.exportar_registros(tabela), formato, COLUNAS_EXPORTACAO[tabela])
+
+
+def iniciar():
+    from banco_dados import CAMPOS_IMPORTACAO, COLUNAS_EXPORTACAO, Database
+
+    parser = argparse.ArgumentParser(description="Importação e exportação em massa de usuários, projetos e demandas.")
+    parser.add_argument("acao", choices=["importar", "exportar"])
+    parser.add_argument("tabela", choices=list(CAMPOS_IMPORTACAO))
+    parser.add_argument("arquivo", help="caminho do arquivo .csv ou .jsonl; '-' usa a entrada/saída padrão")
+    parser.add_argument("--formato", choices=FORMATOS, help="obrigatório com '-'; por padrão vem da extensão")
+    parser.add_argument("--banco", default="gestao.db")
+    parser.add_argument("--tamanho-lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    try:
+        formato = _formato(args.arquivo, args.formato)
+    except ValueError as erro:
+        parser.error(str(erro))
+    db = Database(args.banco)
+
+    if args.acao == "exportar":
+        if args.arquivo == "-":
+            escrever_registros(sys.stdout, db.exportar_registros(args.tabela), formato, COLUNAS_EXPORTACAO[args.tabela])
+        else:
+            total = exportar_arquivo(db, args.tabela, args.arquivo, formato)
+            print(f"{total} registros exportados para {args.arquivo}")
+        return
+
+    if args.arquivo == "-":
+        resultado = db.importar_registros(args.tabela, ler_registros(sys.stdin, formato), args.tamanho_lote)
+    else:
+        resultado = importar_arquivo(db, args.tabela, args.arquivo, formato, args.tamanho_lote)
+    for numero, mensagem in resultado["erros"]:
+        print(f"Registro {numero}: {mensagem}", file=sys.stderr)
+    print(f"{resultado['inseridos']} registros importados, {len(resultado['erros'])} com erro")
+    if resultado["erros"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    iniciar()